@@ -1,18 +1,35 @@
+import hashlib
 import json
 import logging
 import os
 import tempfile
+import time
+from collections import deque
 from collections.abc import Generator
+from functools import lru_cache
 from threading import Event
 from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 import youtube
 
+logger = logging.getLogger(__name__)
+
 ChannelUploadFilter = Literal["all_videos", "full_videos_only", "livestreams_only", "shorts_only"]
 PlaylistEntryFilter = Literal["all_videos", "new_entries_from_the_top"]
 
+# keyword arguments of youtube.Channel.list_uploads for each selector
+SELECTOR_KWARGS: dict[ChannelUploadFilter, dict[str, bool]] = {
+    "all_videos": {"full_videos_only": False, "livestreams_only": False, "shorts_only": False},
+    "full_videos_only": {"full_videos_only": True, "livestreams_only": False, "shorts_only": False},
+    "livestreams_only": {"full_videos_only": False, "livestreams_only": True, "shorts_only": False},
+    "shorts_only": {"full_videos_only": False, "livestreams_only": False, "shorts_only": True},
+}
+
+# absolute path -> (sha256 of the last written content, mtime of the file right after that write)
+_last_written: dict[str, tuple[bytes, int]] = {}
+
 
 class ThreadStoppedError(Exception):
     pass
@@ -33,12 +50,17 @@ class PerPlaylistSettings(BaseModel):
 
 
 class SettingsChannels(BaseModel):
+    # seen_video_ids is updated in the hot loop of process() with IDs that come straight from the API, don't revalidate them
+    model_config = ConfigDict(validate_assignment=False)
+
     channel_name: str
     seen_video_ids: list[str]
     settings: PerChannelSettings | None = None
 
 
 class SettingsPlaylists(BaseModel):
+    model_config = ConfigDict(validate_assignment=False)
+
     playlist_name: str
     seen_video_ids: list[str]
     settings: PerPlaylistSettings
@@ -58,83 +80,127 @@ def grab_specific_setting(global_settings: SettingsGlobal, local_settings: PerCh
 
 
 def read_settings(file: str) -> Settings:
-    with open(file, encoding="utf-8") as f:
-        raw = json.load(f)
-        return Settings(**raw)
+    with open(file, "rb") as f:
+        settings = Settings.model_validate_json(f.read())
+    _replay_journal(file, settings)
+    return settings
+
+
+def _journal_path(file: str) -> str:
+    return f"{file}.journal.jsonl"
+
+
+def append_seen(file: str, section: Literal["channels", "playlists"], element_id: str, video_id: str) -> None:
+    """Records a newly seen video ID without rewriting the whole settings file.
+    The journal is replayed by read_settings and removed by the next write_settings."""
+    entry = json.dumps({"section": section, "id": element_id, "video_id": video_id, "time": time.time()})
+    with open(_journal_path(file), "a", encoding="utf-8") as f:
+        f.write(entry + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+@lru_cache(maxsize=1)
+def keep_video_ids_setting() -> int:
+    """How many seen video IDs are kept per channel. Read lazily so it picks up the .env loaded by the entry point."""
+    return int(os.getenv("keep_video_ids", "50"))
+
+
+def _replay_journal(file: str, settings: Settings) -> None:
+    journal = _journal_path(file)
+    if not os.path.exists(journal):
+        return
+    keep_video_ids = keep_video_ids_setting()
+    with open(journal, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:  # last line can be cut off if we crashed mid-write
+                logger.warning("Skipping unreadable journal line in %s: %s", journal, line)
+                continue
+            section: dict[str, SettingsChannels] | dict[str, SettingsPlaylists] = getattr(settings, entry["section"])
+            element = section.get(entry["id"])
+            if element is None or entry["video_id"] in element.seen_video_ids:
+                continue
+            element.seen_video_ids.insert(0, entry["video_id"])
+            if entry["section"] == "channels":
+                del element.seen_video_ids[keep_video_ids:]
+
+
+def _clear_journal(file: str) -> None:
+    journal = _journal_path(file)
+    if os.path.exists(journal):
+        os.remove(journal)
+
+
+def _fsync_dir(dir_name: str) -> None:
+    """Persists a rename inside dir_name. Only possible on POSIX, Windows can't open directories."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(dir_name, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=64)
+def _resolve_path(file: str) -> tuple[str, str]:
+    """Returns the absolute path of file and its directory.
+    The tempfile has to be created in that directory: os.replace can't move files across filesystems."""
+    abs_path = os.path.abspath(file)
+    return abs_path, os.path.dirname(abs_path) or "."
+
+
+def check_config_dir(cfg_dir: str = "auto_adder_config") -> None:
+    """Fails early with a readable message instead of at the first rename in write_settings."""
+    if not os.path.isdir(cfg_dir) or not os.access(cfg_dir, os.W_OK):
+        raise PermissionError(f"The auto adder config directory {os.path.abspath(cfg_dir)} doesn't exist or isn't writable.")
+
 
+def write_settings(file: str, settings: Settings, indent: int | None = None, mode: Literal["create", "overwrite"] = "overwrite") -> None:
+    """mode="create" raises FileExistsError if file already exists. Checking and creating is one atomic step,
+    so two creates racing each other can't overwrite one another."""
+    # Serialize settings to JSON. Compact by default, pass an indent for files that are meant to be read/edited by hand.
+    json_str = settings.model_dump_json(indent=indent)
 
-def write_settings(file: str, settings: Settings) -> None:
-    # Serialize settings to JSON
-    json_str = settings.model_dump_json(indent=4)
+    # Skip the rewrite if we already wrote exactly this content and nobody touched the file since
+    abs_path, dir_name = _resolve_path(file)
+    digest = hashlib.sha256(json_str.encode("utf-8")).digest()
+    last = _last_written.get(abs_path)
+    if mode == "overwrite" and last is not None and last[0] == digest and os.path.exists(abs_path) and os.stat(abs_path).st_mtime_ns == last[1]:
+        _clear_journal(file)
+        return
 
-    dir_name = os.path.dirname(os.path.abspath(file))
     # Create a temporary file in the same directory
     with tempfile.NamedTemporaryFile("w", dir=dir_name, delete=False, encoding="utf-8") as tmp_file:
         tmp_file.write(json_str)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())  # data must be on disk before the rename, otherwise a crash can leave an empty file
         temp_name = tmp_file.name
 
     try:
-        os.replace(temp_name, file)  # Atomically replace the original file with the temp file
+        if mode == "create":
+            os.link(temp_name, file)  # fails if file exists, unlike os.replace
+            os.remove(temp_name)
+        else:
+            os.replace(temp_name, file)  # Atomically replace the original file with the temp file
     except Exception as e:
         if os.path.exists(temp_name):  # Clean up temp file if something goes wrong
             os.remove(temp_name)
         raise e
-
-
-def process_old(file: str, stop_event: Event) -> Generator[tuple[str, int, int]]:
-    data = read_settings(file)
-    global_settings = data.global_settings
-    process_name = global_settings.name
-    target_playlist = youtube.Playlist(global_settings.target_playlist_id)
-
-    yield f"Initializing {process_name}", 0, len(data.channels)
-
-    for i, (channel_id, channel_elem) in enumerate(data.channels.items()):
-        if stop_event.is_set():
-            raise ThreadStoppedError
-        channel_name = channel_elem.channel_name
-        yield f"{process_name} \n {channel_name}", i, len(data.channels)
-        channel_seen_list = channel_elem.seen_video_ids
-        logging.debug("Channel seen list: %s", channel_seen_list)
-        channel_selector = grab_specific_setting(global_settings, channel_elem.settings, "selector")
-
-        try:
-            c = youtube.Channel(channel_id)
-            videos_to_add: list[str] = []
-            for video_id in c.list_uploads(
-                full_videos_only=channel_selector == "full_videos_only",
-                livestreams_only=channel_selector == "livestreams_only",
-                shorts_only=channel_selector == "shorts_only",
-            ):
-                logging.info("Video ID: %s - %s", video_id, type(video_id))
-                if stop_event.is_set():
-                    raise ThreadStoppedError
-                if video_id in channel_seen_list:
-                    break
-                videos_to_add.append(video_id)
-            success = True
-            for i, video_id in enumerate(reversed(videos_to_add)):
-                if stop_event.is_set():
-                    raise ThreadStoppedError
-                success = bool(success * target_playlist.add_video(video_id))
-                if success:
-                    channel_seen_list.insert(0, video_id)
-                    channel_seen_list = channel_seen_list[0 : int(os.getenv("keep_video_ids", "50"))]
-                    if i > 15 and i % 10 == 0:
-                        data.channels[channel_id].seen_video_ids = channel_seen_list
-                        write_settings(file, data)
-            if success:
-                data.channels[channel_id].seen_video_ids = channel_seen_list
-                write_settings(file, data)
-        except youtube.SkippableError as error:
-            logging.error("Skippable exception caught - will be skipped over. Channel: %s - Msg: %s", channel_name, str(error))
+    _fsync_dir(dir_name)
+    _last_written[abs_path] = (digest, os.stat(abs_path).st_mtime_ns)
+    _clear_journal(file)  # everything in the journal is part of the file now
 
 
 def process(file: str, stop_event: Event) -> Generator[tuple[str, int, int]]:
     data = read_settings(file)
     global_settings = data.global_settings
     process_name = global_settings.name
+    # built per run: the playlist holds the API client of the thread that created it, which must not be shared across threads
     target_playlist = youtube.Playlist(global_settings.target_playlist_id)
+    keep_video_ids = keep_video_ids_setting()
 
     yield f"Initializing {process_name}", 0, len(data.channels)
 
@@ -143,49 +209,48 @@ def process(file: str, stop_event: Event) -> Generator[tuple[str, int, int]]:
             raise ThreadStoppedError
         channel_name = channel_elem.channel_name
         yield f"{process_name} \n {channel_name}", i, len(data.channels)
-        channel_seen_list = channel_elem.seen_video_ids
-        logging.debug("Channel seen list: %s", channel_seen_list)
-        channel_selector = grab_specific_setting(global_settings, channel_elem.settings, "selector")
+        # seen IDs are stored newest first, so slice before building the deque (it would keep the last maxlen items otherwise)
+        channel_seen_list = deque(channel_elem.seen_video_ids[:keep_video_ids], maxlen=keep_video_ids)
+        channel_seen_set = set(channel_seen_list)
+        logger.debug("Channel seen list: %s", channel_seen_list)
+        channel_selector: ChannelUploadFilter = grab_specific_setting(global_settings, channel_elem.settings, "selector")
 
         try:
             c = youtube.Channel(channel_id)
             videos_to_add: list[str] = []
-            for video_id in c.list_uploads(
-                full_videos_only=channel_selector == "full_videos_only",
-                livestreams_only=channel_selector == "livestreams_only",
-                shorts_only=channel_selector == "shorts_only",
-            ):
-                logging.info("Video ID: %s - %s", video_id, type(video_id))
+            for video_id in c.list_uploads(**SELECTOR_KWARGS[channel_selector]):
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Video ID: %s - %s", video_id, type(video_id))
                 if stop_event.is_set():
                     raise ThreadStoppedError
-                if video_id in channel_seen_list:
+                if video_id in channel_seen_set:
                     break
                 videos_to_add.append(video_id)
             full_success = True
-            for i, video_id in enumerate(reversed(videos_to_add)):
+            for video_id in reversed(videos_to_add):
                 if stop_event.is_set():
                     raise ThreadStoppedError
                 this_success = target_playlist.add_video(video_id)
-                full_success = bool(full_success * this_success)
                 if this_success:
-                    channel_seen_list.insert(0, video_id)
-                    channel_seen_list = channel_seen_list[0 : int(os.getenv("keep_video_ids", "50"))]
-                    if i > 15 and i % 10 == 0:
-                        data.channels[channel_id].seen_video_ids = channel_seen_list
-                        write_settings(file, data)
+                    channel_seen_list.appendleft(video_id)
+                    # videos are added oldest first, so only the prefix before the first failure is journaled: the upload scan
+                    # stops at the first seen ID, and a recorded video newer than a failed one would keep that one from being retried
+                    if full_success:
+                        append_seen(file, "channels", channel_id, video_id)
+                full_success = full_success and this_success
             if full_success:
-                data.channels[channel_id].seen_video_ids = channel_seen_list
-                write_settings(file, data)
+                channel_elem.seen_video_ids[:] = channel_seen_list  # in place, no model __setattr__ or new list
         except youtube.SkippableError as error:
-            logging.error("Skippable exception caught - will be skipped over. Channel: %s - Msg: %s", channel_name, str(error))
+            logger.error("Skippable exception caught - will be skipped over. Channel: %s - Msg: %s", channel_name, str(error))
 
     for i, (playlist_id, playlist_elem) in enumerate(data.playlists.items()):
         if stop_event.is_set():
             raise ThreadStoppedError
         playlist_name = playlist_elem.playlist_name
         yield f"{process_name} \n {playlist_name}", i, len(data.playlists)
-        playlist_seen_list = playlist_elem.seen_video_ids
-        logging.debug("Playlist seen list: %s", playlist_seen_list)
+        playlist_seen_list = deque(playlist_elem.seen_video_ids)
+        playlist_seen_set = set(playlist_seen_list)
+        logger.debug("Playlist seen list: %s", playlist_seen_list)
         playlist_selector: PlaylistEntryFilter = grab_specific_setting(global_settings, playlist_elem.settings, "selector")
 
         try:
@@ -193,38 +258,47 @@ def process(file: str, stop_event: Event) -> Generator[tuple[str, int, int]]:
             videos_to_add = []
             for video_elem in p.yield_elements(["contentDetails"]):
                 video_id = video_elem["contentDetails"]["videoId"]
-                logging.info("Video ID: %s - %s", video_id, type(video_id))
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Video ID: %s - %s", video_id, type(video_id))
                 if stop_event.is_set():
                     raise ThreadStoppedError
-                if playlist_selector == "new_entries_from_the_top" and video_id in playlist_seen_list:
+                if playlist_selector == "new_entries_from_the_top" and video_id in playlist_seen_set:
                     break
 
-                if video_id not in playlist_seen_list:
+                if video_id not in playlist_seen_set:
                     videos_to_add.append(video_id)
             full_success = True
-            for i, video_id in enumerate(reversed(videos_to_add)):
+            for video_id in reversed(videos_to_add):
                 if stop_event.is_set():
                     raise ThreadStoppedError
                 this_success = target_playlist.add_video(video_id)
-                full_success = bool(full_success * this_success)
+                full_success = full_success and this_success
                 if this_success:
-                    playlist_seen_list.insert(0, video_id)
-                    if i > 15 and i % 10 == 0:
-                        data.playlists[playlist_id].seen_video_ids = playlist_seen_list
-                        write_settings(file, data)
-            data.playlists[playlist_id].seen_video_ids = playlist_seen_list
-            write_settings(file, data)
+                    playlist_seen_list.appendleft(video_id)
+                    append_seen(file, "playlists", playlist_id, video_id)
+            playlist_elem.seen_video_ids[:] = playlist_seen_list  # in place, no model __setattr__ or new list
         except youtube.SkippableError as error:
-            logging.error(
+            logger.error(
                 "Skippable exception caught - will be skipped over. Playlist: %s - Playlist ID: %s - Msg: %s", playlist_name, playlist_id, str(error)
             )
 
+    write_settings(file, data)
+
+
+@lru_cache(maxsize=8)
+def _read_settings_cached(file: str, mtime: float) -> Settings:  # noqa: ARG001
+    """mtime is only part of the cache key, so that edits to the file invalidate the cached entry.
+    Callers must copy the result before mutating it."""
+    return read_settings(file)
+
 
 def create(filename: str, name: str, target_playlist_id: str, selector: ChannelUploadFilter) -> None:
-    if os.path.isfile(f"auto_adder_config/{filename}"):
-        raise youtube.SkippableError("Auto adder can't be created, the file already exists.")
-    data = read_settings("auto_adder_config/template.json")
+    template = "auto_adder_config/template.json"
+    data = _read_settings_cached(template, os.path.getmtime(template)).model_copy(deep=True)
     data.global_settings.name = name
     data.global_settings.target_playlist_id = target_playlist_id
     data.global_settings.selector = selector
-    write_settings(f"auto_adder_config/{filename}", data)
+    try:
+        write_settings(f"auto_adder_config/{filename}", data, indent=4, mode="create")
+    except FileExistsError as error:
+        raise youtube.SkippableError("Auto adder can't be created, the file already exists.") from error
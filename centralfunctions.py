@@ -1,169 +1,148 @@
 import logging
+import queue
 import tkinter as tk
+from functools import cache
 from tkinter import font, ttk
 from tkinter.scrolledtext import ScrolledText
-from typing import Any, get_args
+from typing import Any, Literal, get_args
 
 from colors import colors
 
 
-def ttk_styles(root: tk.Tk) -> None:
-    style = ttk.Style(root)
-    style.theme_use("clam")
-    style.configure(
-        "TButton",
-        background=colors["bg-6"],
-        foreground=colors["fg"],
-    )
-    style.map(
+def _state_colors(active: str, pressed: str, disabled: str | None = None) -> dict[str, list[tuple[str, str]]]:
+    """style.map() arguments for a button, foreground stays the same in every state except disabled."""
+    background = [("active", active), ("pressed", pressed)]
+    foreground = [("active", colors["fg"]), ("pressed", colors["fg"])]
+    if disabled:
+        background.append(("disabled", disabled))
+        foreground.append(("disabled", colors["fg-disabled"]))
+    return {"background": background, "foreground": foreground}
+
+
+# (style name, style.configure() kwargs, style.map() kwargs)
+_BUTTON_STYLES: list[tuple[str, dict[str, str], dict[str, list[tuple[str, str]]]]] = [
+    (
         "TButton",
-        background=[("active", colors["bg-8"]), ("pressed", colors["bg-7"]), ("disabled", colors["bg-3"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"]), ("disabled", colors["fg-disabled"])],
-    )
-    style.configure(
-        "Confirm.TButton",
-        background=colors["bg-6"],
-        foreground=colors["fg"],
-    )
-    style.map(
+        {"background": colors["bg-6"], "foreground": colors["fg"]},
+        _state_colors(colors["bg-8"], colors["bg-7"], colors["bg-3"]),
+    ),
+    (
         "Confirm.TButton",
-        background=[("active", colors["green-2"]), ("pressed", colors["green-4"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"])],
-    )
-    style.configure(
+        {"background": colors["bg-6"], "foreground": colors["fg"]},
+        _state_colors(colors["green-2"], colors["green-4"]),
+    ),
+    (
         "Exit.TButton",
-        background=colors["bg-6"],
-        foreground=colors["fg"],
-    )
-    style.map(
-        "Exit.TButton",
-        background=[("active", colors["red-3"]), ("pressed", colors["red-4"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"])],
-    )
-    style.configure(
-        "Working.TButton",
-        background=colors["blue-3"],
-        foreground=colors["fg"],
-    )
-    style.map(
+        {"background": colors["bg-6"], "foreground": colors["fg"]},
+        _state_colors(colors["red-3"], colors["red-4"]),
+    ),
+    (
         "Working.TButton",
-        background=[("active", colors["blue-4"]), ("pressed", colors["blue-4"]), ("disabled", colors["blue-4"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"]), ("disabled", colors["fg-disabled"])],
-    )
-    style.configure(
+        {"background": colors["blue-3"], "foreground": colors["fg"]},
+        _state_colors(colors["blue-4"], colors["blue-4"], colors["blue-4"]),
+    ),
+    (
         "Success.TButton",
-        background=colors["green-3"],
-        foreground=colors["fg"],
-    )
-    style.map(
-        "Success.TButton",
-        background=[("active", colors["green-4"]), ("pressed", colors["green-4"]), ("disabled", colors["green-2"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"]), ("disabled", colors["fg-disabled"])],
-    )
-    style.configure(
-        "Failure.TButton",
-        background=colors["red-3"],
-        foreground=colors["fg"],
-    )
-    style.map(
+        {"background": colors["green-3"], "foreground": colors["fg"]},
+        _state_colors(colors["green-4"], colors["green-4"], colors["green-2"]),
+    ),
+    (
         "Failure.TButton",
-        background=[("active", colors["red-4"]), ("pressed", colors["red-4"]), ("disabled", colors["red-2"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"]), ("disabled", colors["fg-disabled"])],
-    )
+        {"background": colors["red-3"], "foreground": colors["fg"]},
+        _state_colors(colors["red-4"], colors["red-4"], colors["red-2"]),
+    ),
+]
+
+
+_progress_color = colors["green-2"]
+# same layout as _BUTTON_STYLES, an empty map means the style has no state-specific colors
+_WIDGET_STYLES: list[tuple[str, dict[str, str], dict[str, list[tuple[str, str]]]]] = [
+    ("TLabel", {"background": colors["bg-3"], "foreground": colors["fg"]}, {}),
+    ("Warning.TLabel", {"background": colors["bg-3"], "foreground": colors["red-4"]}, {}),
+    ("Selected.TLabel", {"background": colors["blue-5"], "foreground": colors["fg"]}, {}),
+    (
+        "TRadiobutton",
+        {"background": colors["bg-3"], "foreground": colors["fg"], "indicatorcolor": colors["bg-3"], "focuscolor": ""},
+        {
+            "background": [("active", colors["bg-3"]), ("pressed", colors["bg-3"])],
+            "foreground": [("active", colors["fg"]), ("pressed", colors["fg"])],
+        },
+    ),
+    ("TFrame", {"background": colors["bg-3"], "foreground": colors["fg"]}, {}),
+    ("Titlebar.TFrame", {"background": colors["bg-3"], "foreground": colors["fg"]}, {}),
+    (
+        "TEntry",
+        {"foreground": colors["fg"], "fieldbackground": colors["bg-6"]},
+        {"fieldbackground": [("focus", colors["bg-6"]), ("disabled", colors["bg-3"])], "foreground": [("focus", colors["fg"])]},
+    ),
+    (
+        "TMenubutton",  # OptionMenu
+        {"foreground": colors["fg"], "background": colors["bg-6"]},
+        {"background": [("active", colors["bg-8"]), ("disabled", colors["bg-3"])], "foreground": [("active", colors["fg"])]},
+    ),
+    (
+        "TProgressbar",
+        {"throughcolor": _progress_color, "lightcolor": _progress_color, "darkcolor": _progress_color, "background": _progress_color},
+        {},
+    ),
+    (
+        "TSpinbox",
+        {"foreground": colors["fg"], "fieldbackground": colors["bg-6"]},
+        {"fieldbackground": [("focus", colors["bg-6"]), ("disabled", colors["bg-3"])], "foreground": [("focus", colors["fg"])]},
+    ),
+]
+
+
+def ttk_styles(root: tk.Tk) -> None:
+    # styles live in the Tcl interpreter, so only configure them once per root
+    if root.tk.call("info", "exists", "::ttk_styles_applied"):
+        return
+    root.setvar("::ttk_styles_applied", 1)
+
+    style = ttk.Style(root)
+    style.theme_use("clam")
+    for name, configure, state_map in _BUTTON_STYLES + _WIDGET_STYLES:
+        style.configure(name, **configure)
+        if state_map:
+            style.map(name, **state_map)
 
     media_font = font.Font(family="Times New Roman", size=100, weight="bold")
     style.configure("Media.TButton", background=colors["bg-6"], foreground=colors["fg"], font=media_font)
+    style.configure("Working.Media.TButton", background=colors["blue-3"], foreground=colors["fg"], font=media_font)
     style.configure("Success.Media.TButton", background=colors["green-3"], foreground=colors["fg"], font=media_font)
     style.configure("Failure.Media.TButton", background=colors["red-3"], foreground=colors["fg"], font=media_font)
 
-    # Label
-    style.configure(
-        "TLabel",
-        background=colors["bg-3"],
-        foreground=colors["fg"],
-    )
-    style.configure(
-        "Warning.TLabel",
-        background=colors["bg-3"],
-        foreground=colors["red-4"],
-    )
-    style.configure(
-        "Selected.TLabel",
-        background=colors["blue-5"],
-        foreground=colors["fg"],
-    )
-
-    # Radiobutton
-    style.configure("TRadiobutton", background=colors["bg-3"], foreground=colors["fg"], indicatorcolor=colors["bg-3"], focuscolor="")
-    style.map(
-        "TRadiobutton",
-        background=[("active", colors["bg-3"]), ("pressed", colors["bg-3"])],
-        foreground=[("active", colors["fg"]), ("pressed", colors["fg"])],
-    )
-
-    # Frame
-    style.configure(
-        "TFrame",
-        background=colors["bg-3"],
-        foreground=colors["fg"],
-    )
-    style.configure(
-        "Titlebar.TFrame",
-        background=colors["bg-3"],
-        foreground=colors["fg"],
-    )
-
-    # Entry
-    style.configure(
-        "TEntry",
-        foreground=colors["fg"],
-        fieldbackground=colors["bg-6"],
-    )
-    style.map("TEntry", fieldbackground=[("focus", colors["bg-6"]), ("disabled", colors["bg-3"])], foreground=[("focus", colors["fg"])])
-
-    # OptionMenu
-    style.configure(
-        "TMenubutton",
-        foreground=colors["fg"],
-        background=colors["bg-6"],
-    )
-    style.map("TMenubutton", background=[("active", colors["bg-8"]), ("disabled", colors["bg-3"])], foreground=[("active", colors["fg"])])
-
-    # Progressbar
-    tmp_color = colors["green-2"]
-    style.configure(
-        "TProgressbar",
-        throughcolor=tmp_color,
-        lightcolor=tmp_color,
-        darkcolor=tmp_color,
-        background=tmp_color,
-    )
-
-    # Spinbox
-    style.configure(
-        "TSpinbox",
-        foreground=colors["fg"],
-        fieldbackground=colors["bg-6"],
-    )
-    style.map(
-        "TSpinbox",
-        fieldbackground=[("focus", colors["bg-6"]), ("disabled", colors["bg-3"])],
-        foreground=[("focus", colors["fg"])],
-    )
+
+TITLE_FONT = ("TkDefaultFont", 12, "bold")
+_MENU_STYLE = {"background": colors["bg-3"], "foreground": colors["fg"], "activebackground": colors["blue-2"], "relief": "flat"}
 
 
 def tk_styles(element: tk.Menu) -> dict[str, str]:
     if isinstance(element, tk.Menu):
-        return {"background": colors["bg-3"], "foreground": colors["fg"], "activebackground": colors["blue-2"], "relief": "flat"}
+        return _MENU_STYLE
     raise TypeError("Styling for this class is not defined.")
 
 
+def style_option_menu(option_menu: ttk.OptionMenu) -> None:
+    menu = option_menu["menu"]  # every item access is a Tcl round-trip, so only fetch it once
+    menu.configure(**tk_styles(menu))
+
+
 def tk_root_styles(root: tk.Tk | tk.Toplevel) -> None:
     root.config(bg=colors["bg-3"])
 
 
+@cache
+def _literal_members(literal_type: Any) -> frozenset[Any]:
+    return frozenset(get_args(literal_type))
+
+
 def is_valid_literal(val: str, literal_type: Any) -> bool:
-    return val in get_args(literal_type)
+    return val in _literal_members(literal_type)
+
+
+LOG_FLUSH_INTERVAL_MS = 50
+LOG_MAX_LINES = 1000
 
 
 class SubWindow:
@@ -171,45 +150,118 @@ class SubWindow:
     root: tk.Tk
     log_level: int
     log_visible: bool
-    log_display: ScrolledText
+    log_display: ScrolledText | None
+    button_frame: ttk.Frame
+    _log_queue: queue.SimpleQueue[tuple[int, str]]
+    _log_pending: bool
     btn_width: int = 50
     padx = 5
     pady = 5
 
     def setup_logging(self) -> None:
+        self._log_queue = queue.SimpleQueue()
+        self._log_pending = False
+        self.window.bind("<<NewLog>>", lambda _: self.window.after(LOG_FLUSH_INTERVAL_MS, self._flush_logs))
+        # every way of destroying the window (on_close, destroy() calls elsewhere) must let go of the shared handler
+        self.window.bind("<Destroy>", self._on_destroy)
         root_logger = logging.getLogger()
         self.log_level = logging.ERROR
         root_logger.setLevel(self.log_level)
-        handler = TkinterLogHandler(app=self, log_level=self.log_level)
-        root_logger.addHandler(handler)
-        # Avoid adding duplicate handlers
-        if not any(isinstance(h, TkinterLogHandler) for h in root_logger.handlers):
-            root_logger.addHandler(handler)
+        # Only one handler ever gets attached; later windows just take it over
+        for handler in root_logger.handlers:
+            if isinstance(handler, TkinterLogHandler):
+                handler.app = self
+                break
+        else:
+            root_logger.addHandler(TkinterLogHandler(app=self, log_level=self.log_level))
 
     def on_close(self) -> None:
         self.window.destroy()
         self.root.destroy()
 
+    def hide(self) -> None:
+        """Hides the window instead of destroying it and brings the main menu back."""
+        self.detach_log_handler()
+        self.window.withdraw()
+        self.root.deiconify()
+
+    def _on_destroy(self, event: Any) -> None:
+        if event.widget is self.window:  # <Destroy> of the toplevel also fires for each of its children
+            self.detach_log_handler()
+
+    def detach_log_handler(self) -> None:
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, TkinterLogHandler) and handler.app is self:
+                handler.app = None
+
+    def reset(self) -> None:
+        """Puts a hidden window back into its freshly opened state before it is shown again."""
+        if self.log_display is not None:
+            self.log_display.delete("1.0", tk.END)
+            self.log_display.pack_forget()
+        self.log_visible = False
+        self.setup_logging()
+        self.set_button_states("normal")
+
+    def set_button_states(self, state: Literal["normal", "disabled"]) -> None:
+        """Enables or disables everything in button_frame, e.g. while a worker thread is busy."""
+        for child in self.button_frame.winfo_children():
+            child.config(state=state)  # type:ignore[call-arg]
+
+    def show_window(self) -> None:
+        """Maps a window that was built while withdrawn, after a single layout pass."""
+        self.window.update_idletasks()
+        self.window.deiconify()
+
+    def queue_log(self, levelno: int, msg: str) -> None:
+        """Thread-safe. Queued lines are handed to the Tk thread with a <<NewLog>> event and written in one go,
+        at most once every LOG_FLUSH_INTERVAL_MS."""
+        self._log_queue.put((levelno, msg))
+        if not self._log_pending:
+            self._log_pending = True
+            self.window.event_generate("<<NewLog>>", when="tail")
+
+    def _flush_logs(self) -> None:
+        self._log_pending = False  # reset before draining, so lines queued from now on generate a new event
+        batch: list[tuple[int, str]] = []
+        while True:
+            try:
+                batch.append(self._log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            # lines beyond LOG_MAX_LINES would be deleted again right after the insert, so don't insert them at all
+            self.show_log_if_needed(max(levelno for levelno, _ in batch), "\n".join(msg for _, msg in batch[-LOG_MAX_LINES:]))
+
     def show_log_if_needed(self, levelno: int, msg: str) -> None:
         # Only show if severity is high enough and not already visible
+        if self.log_display is None:
+            self.log_display = ScrolledText(self.window, height=10)
         if not self.log_visible and levelno >= self.log_level:
             self.log_display.pack(padx=10, pady=10)
             self.log_visible = True
 
         # Append the log message
         self.log_display.insert(tk.END, msg + "\n")
+        lines = int(self.log_display.index("end-1c").split(".")[0])
+        if lines > LOG_MAX_LINES:
+            self.log_display.delete("1.0", f"{lines - LOG_MAX_LINES}.0")
         self.log_display.see(tk.END)
 
 
 class TkinterLogHandler(logging.Handler):
     def __init__(self, app: SubWindow, log_level: int = logging.ERROR) -> None:
-        super().__init__()
-        self.app = app  # Reference to main app (which holds the widget)
-        self.level_threshold = log_level
+        super().__init__(level=log_level)  # records below the level are dropped by logging before they are formatted
+        self.app: SubWindow | None = app  # Reference to main app (which holds the widget), None while no window shows logs
 
     def emit(self, record: logging.LogRecord) -> None:
-        msg = self.format(record)
-        self.app.log_display.after(0, self.app.show_log_if_needed, record.levelno, msg)
+        app = self.app
+        if app is None:
+            return
+        try:
+            app.queue_log(record.levelno, self.format(record))
+        except (tk.TclError, RuntimeError):  # e.g. the window is gone; a broken log display must never break the logging call
+            self.handleError(record)
 
 
 class ToolTip:
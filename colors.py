@@ -1,8 +1,19 @@
 import json
 import os
+from collections.abc import Mapping
+from types import MappingProxyType
 
 
-def __load_colors() -> dict[str, str]:
+# every theme file has to define all of these, so a broken theme fails at startup instead of on some later style lookup
+PALETTE_KEYS = frozenset(
+    ["fg", "fg-disabled"]
+    + [f"bg-{i}" for i in range(1, 9)]
+    + [f"{color}-{i}" for color in ("blue", "green", "yellow", "red") for i in range(1, 5)]
+    + ["blue-5"]
+)
+
+
+def __load_colors() -> Mapping[str, str]:
     theme = os.getenv("THEME", "light")
     match theme:
         case "light":
@@ -11,9 +22,12 @@ def __load_colors() -> dict[str, str]:
             colors_path = "colors/dark.json"
         case _:
             colors_path = "colors/light.json"
-    with open(colors_path, encoding="utf-8") as f:
+    with open(colors_path, "rb") as f:
         data: dict[str, str] = json.load(f)
-        return data
+    missing = PALETTE_KEYS - data.keys()
+    if missing:
+        raise KeyError(f"Theme {colors_path} is missing the colors {', '.join(sorted(missing))}.")
+    return MappingProxyType(data)  # read-only, the palette is shared by every window
 
 
 colors = __load_colors()
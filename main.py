@@ -1,18 +1,18 @@
 from __future__ import annotations
 
 import argparse
+import cProfile
 import logging
 import os
 import platform
 import subprocess
 import threading
-import time
 import tkinter as tk
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from tkinter import filedialog, messagebox, ttk
-from tkinter.scrolledtext import ScrolledText
-from typing import Any, cast
+from typing import Any, cast, get_args
 
 import wget
 from dotenv import load_dotenv
@@ -21,23 +21,42 @@ import auto_adder
 import centralfunctions as cf
 import youtube
 from colors import colors
-from simple_video_player import VideoPlayer
+
+_PLATFORM = platform.system()
+_SKIP_CONFIGS = frozenset({"template.json"})
+PROGRESS_INTERVAL_MS = 33
+_FILTER_OPTIONS = get_args(auto_adder.ChannelUploadFilter)
+_CREATE_FILTER_OPTIONS = ("All Videos", "Full Videos only", "Livestreams only", "Shorts only")
+_PLAYLIST_FILTER_OPTIONS = (("all videos", 0), ("full videos only", 1), ("livestreams only", 2), ("shorts only", 3))
+_SOURCE_TYPES: dict[str, type[youtube.Video | youtube.Playlist | youtube.Channel]] = {
+    "Video": youtube.Video,
+    "Playlist": youtube.Playlist,
+    "Channel Uploads": youtube.Channel,
+}
+# values of the "Add new videos" / "Add all videos" radio buttons
+_MODE_UNSET, _MODE_ADD_NEW, _MODE_ADD_ALL = -1, 0, 1
+_TIP_ADD_NEW = "This will only add future uploads of this channel to your playlist, but none of the already existing videos."
+_TIP_ADD_ALL = "This will add future uploads AND all existing videos to your playlist."
 
 
 class ConfigureSpecificAutoAdd(cf.SubWindow):
     def __init__(self, root: tk.Tk, filepath: str) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Configure: Auto Adder")
 
         self.filepath = filepath
         self.old_cfg = auto_adder.read_settings(self.filepath)
-        self.new_cfg = self.old_cfg.model_copy()
+        # model_copy() is shallow: give new_cfg its own channels dict and global settings, but share the untouched channel entries
+        self.new_cfg = self.old_cfg.model_copy(
+            update={"channels": dict(self.old_cfg.channels), "global_settings": self.old_cfg.global_settings.model_copy()}
+        )
 
         label = ttk.Label(
-            self.window, style="Warning.TLabel", text=f"Configuration page of {self.old_cfg.global_settings.name}", font=("TkDefaultFont", 12, "bold")
+            self.window, style="Warning.TLabel", text=f"Configuration page of {self.old_cfg.global_settings.name}", font=cf.TITLE_FONT
         )
         label.pack(padx=self.padx, pady=self.pady)
 
@@ -53,11 +72,10 @@ class ConfigureSpecificAutoAdd(cf.SubWindow):
         ttk.Label(global_config_section, text="Target Playlist", width=label_width).grid(row=1, column=0, padx=self.padx, pady=self.pady, sticky="w")
         ttk.Entry(global_config_section, textvariable=self.cfg_target_id, width=self.btn_width).grid(row=1, column=1, padx=self.padx, pady=self.pady)
 
-        options = ["all_videos", "full_videos_only", "livestreams_only", "shorts_only"]
         self.cfg_selector = tk.StringVar(global_config_section, value=self.old_cfg.global_settings.selector)
         ttk.Label(global_config_section, text="Video filter", width=label_width).grid(row=2, column=0, padx=self.padx, pady=self.pady, sticky="w")
-        option_menu = ttk.OptionMenu(global_config_section, self.cfg_selector, self.cfg_selector.get(), *options)
-        option_menu["menu"].configure(**cf.tk_styles(option_menu["menu"]))
+        option_menu = ttk.OptionMenu(global_config_section, self.cfg_selector, self.cfg_selector.get(), *_FILTER_OPTIONS)
+        cf.style_option_menu(option_menu)
         option_menu.grid(row=2, column=1, sticky="ew", padx=self.padx, pady=self.pady)
 
         separator = ttk.Separator(self.window, orient="horizontal")
@@ -77,29 +95,29 @@ class ConfigureSpecificAutoAdd(cf.SubWindow):
 
         self.add_new_selector = tk.StringVar(add_new_frame, value=self.cfg_selector.get())
         ttk.Label(add_new_frame, text="Video filter", width=label_width).grid(row=2, column=0, padx=self.padx, pady=self.pady, sticky="w")
-        option_menu = ttk.OptionMenu(add_new_frame, self.add_new_selector, self.add_new_selector.get(), *options)
-        option_menu["menu"].configure(**cf.tk_styles(option_menu["menu"]))
+        option_menu = ttk.OptionMenu(add_new_frame, self.add_new_selector, self.add_new_selector.get(), *_FILTER_OPTIONS)
+        cf.style_option_menu(option_menu)
         option_menu.grid(row=2, column=1, sticky="ew", padx=self.padx, pady=self.pady)
 
         radioframe = ttk.Frame(self.window)
         radioframe.pack()
-        self.add_new_log_or_add_all = tk.StringVar(self.window)
+        self.add_new_log_or_add_all = tk.IntVar(self.window, value=_MODE_UNSET)
         tmp = ttk.Radiobutton(
             radioframe,
             text="Add new videos",
-            value="Add new videos",
+            value=_MODE_ADD_NEW,
             variable=self.add_new_log_or_add_all,
         )
         tmp.grid(row=0, column=0, padx=self.padx * 2, pady=self.pady)
-        cf.ToolTip(tmp, "This will only add future uploads of this channel to your playlist, but none of the already existing videos.")
+        cf.ToolTip(tmp, _TIP_ADD_NEW)
         tmp2 = ttk.Radiobutton(
             radioframe,
             text="Add all videos",
-            value="Add all videos",
+            value=_MODE_ADD_ALL,
             variable=self.add_new_log_or_add_all,
         )
         tmp2.grid(row=0, column=1, padx=self.padx * 2, pady=self.pady)
-        cf.ToolTip(tmp2, "This will add future uploads AND all existing videos to your playlist.")
+        cf.ToolTip(tmp2, _TIP_ADD_ALL)
 
         separator = ttk.Separator(self.window, orient="horizontal")
         separator.pack(fill="x", padx=self.padx, pady=self.pady)
@@ -115,17 +133,19 @@ class ConfigureSpecificAutoAdd(cf.SubWindow):
         btn2 = ttk.Button(self.button_frame, style="Confirm.TButton", text="Save & Exit", command=self.save_exit)
         btn1.grid(row=1, column=0, padx=self.padx, pady=self.pady, sticky="ew")
         btn2.grid(row=1, column=1, padx=self.padx, pady=self.pady, sticky="ew")
+        self.show_window()
 
     def open_file(self) -> None:
-        if self._save():
-            if platform.system() == "Darwin":  # macOS
-                subprocess.call(("open", self.filepath))
-            elif platform.system() == "Windows":  # Windows
-                os.startfile(self.filepath)
-            else:  # linux variants
-                subprocess.call(("xdg-open", self.filepath))
-            time.sleep(2)
-            self.on_close()
+        self._save(self._open_file)
+
+    def _open_file(self) -> None:
+        if _PLATFORM == "Darwin":  # macOS
+            subprocess.call(("open", self.filepath))
+        elif _PLATFORM == "Windows":  # Windows
+            os.startfile(self.filepath)
+        else:  # linux variants
+            subprocess.call(("xdg-open", self.filepath))
+        self.window.after(2000, self.on_close)
 
     def add_new_element(self) -> None:
         self.add_new.config(style="TButton")
@@ -134,52 +154,77 @@ class ConfigureSpecificAutoAdd(cf.SubWindow):
         new_log_or_add = self.add_new_log_or_add_all.get()
         selector = self.add_new_selector.get()
 
-        if not all(x for x in (channel_name, channel_id, new_log_or_add)):
+        if not (channel_name and channel_id and new_log_or_add != _MODE_UNSET):
             messagebox.showerror("Error: Missing fields", "You forgot to fill in all fields and select an option for all channel-specific settings!")
             return
-        c = youtube.Channel(channel_id)
-        if not c.verify():
-            messagebox.showerror(
-                "Error: Invalid Channel ID", "The Channel ID you entered could not be verified and is invalid. Please enter a valid Channel ID!"
-            )
-            return
-        if c.id in self.old_cfg.channels.keys():
-            messagebox.showerror("Error: Entry exists", "The Channel ID you entered already exists in the data and therefore cannot be added again!")
-            return
-
         if not cf.is_valid_literal(selector, auto_adder.ChannelUploadFilter):  # some shit you need to do to make mypy happy
             raise TypeError("how did we get here?")  # some shit you need to do to make mypy happy
         selector = cast(auto_adder.ChannelUploadFilter, selector)
-        videolist = []
-        if new_log_or_add == "Add new videos":
-            videolist = list(
-                c.list_uploads(
-                    size=int(os.getenv("keep_video_ids", "45")),
-                    full_videos_only=selector == "full_videos_only",
-                    livestreams_only=selector == "livestreams_only",
-                    shorts_only=selector == "shorts_only",
+
+        self.add_new.config(state="disabled", style="Working.TButton")
+        add_all = new_log_or_add == _MODE_ADD_ALL
+        threading.Thread(target=self._verify_new_element, args=(channel_id, channel_name, add_all, selector), daemon=True).start()
+
+    def _verify_new_element(self, channel_id: str, channel_name: str, add_all: bool, selector: auto_adder.ChannelUploadFilter) -> None:
+        """Runs in a worker thread; all widget and config changes are handed back to the Tk thread via after()."""
+        try:
+            c = youtube.Channel(channel_id)
+            if not c.verify():
+                self.window.after(
+                    0,
+                    self._fail_add,
+                    "Error: Invalid Channel ID",
+                    "The Channel ID you entered could not be verified and is invalid. Please enter a valid Channel ID!",
                 )
+                return
+            if c.id in self.old_cfg.channels:
+                self.window.after(
+                    0,
+                    self._fail_add,
+                    "Error: Entry exists",
+                    "The Channel ID you entered already exists in the data and therefore cannot be added again!",
+                )
+                return
+            videolist = []
+            if not add_all:  # mark the current uploads as seen, so only future ones get added
+                videolist = list(c.list_uploads(size=auto_adder.keep_video_ids_setting(), **auto_adder.SELECTOR_KWARGS[selector]))
+        except Exception:  # pylint:disable=broad-exception-caught  # any failure must hand control back to the Tk thread
+            logging.exception("Could not verify channel %s.", channel_id)
+            self.window.after(
+                0, self._fail_add, "Error: Channel not verified", "The Channel ID you entered could not be checked, see the log for details."
             )
-        elif new_log_or_add == "Add all videos":
-            pass
-        else:
-            raise TypeError
+            return
+        self.window.after(0, self._finish_add, c.id, channel_name, videolist, selector)
+
+    def _fail_add(self, title: str, message: str) -> None:
+        self.add_new.config(state="normal", style="TButton")
+        messagebox.showerror(title, message)
+
+    def _finish_add(self, channel_id: str, channel_name: str, videolist: list[str], selector: auto_adder.ChannelUploadFilter) -> None:
         new_channel = auto_adder.SettingsChannels(
             channel_name=channel_name, seen_video_ids=videolist, settings=auto_adder.PerChannelSettings(selector=selector)
         )
-        self.new_cfg.channels[c.id] = new_channel
+        self.new_cfg.channels[channel_id] = new_channel
         self.add_new_channel_id.set("")
         self.add_new_channel_name.set("")
         self.add_new_selector.set(self.cfg_selector.get())
-        self.add_new_log_or_add_all.set("")
-        self.add_new.config(style="Success.TButton")
-        self.add_new.after(2000, lambda: self.add_new.config(style="TButton"))
+        self.add_new_log_or_add_all.set(_MODE_UNSET)
+        self.add_new.config(state="normal", style="Success.TButton")
+        self.add_new.after(2000, self._reset_add_new_style)
+
+    def _reset_add_new_style(self) -> None:
+        if self.add_new.winfo_exists():  # window may have been closed in the meantime
+            self.add_new.config(style="TButton")
 
-    def _save(self) -> bool:
+    def _save(self, on_saved: Callable[[], None]) -> None:
+        """Saves the config and then calls on_saved on the Tk thread. The target playlist is verified in a worker thread."""
         channel_id = self.add_new_channel_id.get()
         channel_name = self.add_new_channel_name.get()
         new_log_or_add = self.add_new_log_or_add_all.get()
-        if any(x for x in (channel_name, channel_id, new_log_or_add)):
+        cfg_name = self.cfg_name.get()
+        cfg_target_id = self.cfg_target_id.get()
+        cfg_selector = cast(auto_adder.ChannelUploadFilter, self.cfg_selector.get())
+        if channel_name or channel_id or new_log_or_add != _MODE_UNSET:
             result = messagebox.askyesno(
                 "Warning: Unsaved changes",
                 'Fields in the "Add Channel" section have been edited, but not saved (remember to press "Add new channel" '
@@ -189,35 +234,56 @@ class ConfigureSpecificAutoAdd(cf.SubWindow):
             if result is True:  # Wanna discard: YES
                 pass
             elif result is False:  # Wanna discard: NO
-                return False
+                return
 
-        target_p = youtube.Playlist(self.cfg_target_id.get())
-        if not target_p.verify():
+        self.set_button_states("disabled")
+        threading.Thread(target=self._verify_target, args=(cfg_name, cfg_target_id, cfg_selector, on_saved), daemon=True).start()
+
+    def _verify_target(self, cfg_name: str, cfg_target_id: str, cfg_selector: auto_adder.ChannelUploadFilter, on_saved: Callable[[], None]) -> None:
+        try:
+            target_p = youtube.Playlist(cfg_target_id)
+            valid = target_p.verify()
+        except Exception:  # pylint:disable=broad-exception-caught  # any failure must hand control back to the Tk thread
+            logging.exception("Could not verify target playlist %s.", cfg_target_id)
+            self.window.after(0, self._fail_save)
+            return
+        self.window.after(0, self._finish_save, cfg_name, target_p.id, cfg_selector, valid, on_saved)
+
+    def _fail_save(self) -> None:
+        self.set_button_states("normal")
+        messagebox.showerror("Error: Target Playlist not verified", "The target playlist could not be checked, see the log for details.")
+
+    def _finish_save(
+        self, cfg_name: str, target_id: str, cfg_selector: auto_adder.ChannelUploadFilter, valid: bool, on_saved: Callable[[], None]
+    ) -> None:
+        self.set_button_states("normal")
+        if not valid:
             messagebox.showerror(
                 "Error: Target Playlist is invalid", "The entered target playlist could not be verified. Please enter a valid playlist ID or URL."
             )
 
-        self.new_cfg.global_settings.name = self.cfg_name.get()
-        self.new_cfg.global_settings.target_playlist_id = target_p.id
-        cfg_selector = cast(auto_adder.ChannelUploadFilter, self.cfg_selector.get())
+        self.new_cfg.global_settings.name = cfg_name
+        self.new_cfg.global_settings.target_playlist_id = target_id
         self.new_cfg.global_settings.selector = cfg_selector
-        auto_adder.write_settings(self.filepath, self.new_cfg)
-        return True
+        auto_adder.write_settings(self.filepath, self.new_cfg, indent=4)
+        on_saved()
 
     def save_back(self) -> None:
-        if self._save():
-            self.window.destroy()
-            AutoAddWindow(self.root)
+        self._save(self._back)
+
+    def _back(self) -> None:
+        self.window.destroy()
+        AutoAddWindow(self.root)
 
     def save_exit(self) -> None:
-        if self._save():
-            self.on_close()
+        self._save(self.on_close)
 
 
 class ConfigureAutoAdd(cf.SubWindow):
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Configure: Auto Adder")
@@ -226,7 +292,7 @@ class ConfigureAutoAdd(cf.SubWindow):
             self.window,
             style="Warning.TLabel",
             text="Auto adder: General configuration page",
-            font=("TkDefaultFont", 12, "bold"),
+            font=cf.TITLE_FONT,
         )
         label.pack(padx=self.padx, pady=self.pady)
 
@@ -235,12 +301,11 @@ class ConfigureAutoAdd(cf.SubWindow):
 
         cfg_path = os.path.abspath("auto_adder_config")
         self.start_buttons: list[ttk.Button] = []
-        for file in os.listdir(cfg_path):
-            if file == "template.json":
-                continue
-            filepath = os.path.join(cfg_path, file)
-            auto_adder.read_settings(filepath)
-            self.add_main_button(filepath)
+        with os.scandir(cfg_path) as entries:
+            for entry in entries:
+                if entry.name in _SKIP_CONFIGS or not entry.name.endswith(".json") or not entry.is_file():  # also skips the seen-ID journals
+                    continue
+                self.add_main_button(entry.path, auto_adder.read_settings(entry.path))
 
         separator = ttk.Separator(self.window, orient="horizontal")
         separator.pack(fill="x", padx=self.padx, pady=self.pady)
@@ -249,9 +314,9 @@ class ConfigureAutoAdd(cf.SubWindow):
         ttk.Button(self.window, style="Confirm.TButton", text="Confirm & Back", command=self.on_confirm, width=self.btn_width).pack(
             padx=self.padx, pady=self.pady
         )
+        self.show_window()
 
-    def add_main_button(self, filepath: str) -> None:
-        cfg = auto_adder.read_settings(filepath)
+    def add_main_button(self, filepath: str, cfg: auto_adder.Settings) -> None:
         packed = partial(self.use_main_button, filepath=filepath)
         button = ttk.Button(self.window, text=cfg.global_settings.name, command=packed, width=self.btn_width)
         self.start_buttons.append(button)
@@ -270,6 +335,7 @@ class CreateNewAutoAdd(cf.SubWindow):
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Create: Auto Adder")
@@ -297,11 +363,10 @@ class CreateNewAutoAdd(cf.SubWindow):
             row=2, column=1, padx=self.padx, pady=self.pady
         )
 
-        options = ["All Videos", "Full Videos only", "Livestreams only", "Shorts only"]
-        self.selector = tk.StringVar(textfield_frame, value=options[0])
+        self.selector = tk.StringVar(textfield_frame, value=_CREATE_FILTER_OPTIONS[0])
         ttk.Label(textfield_frame, text="Video filter:", width=self.label_width).grid(row=3, column=0, padx=self.padx, pady=self.pady, sticky="w")
-        option_menu = ttk.OptionMenu(textfield_frame, self.selector, self.selector.get(), *options)
-        option_menu["menu"].configure(**cf.tk_styles(option_menu["menu"]))
+        option_menu = ttk.OptionMenu(textfield_frame, self.selector, self.selector.get(), *_CREATE_FILTER_OPTIONS)
+        cf.style_option_menu(option_menu)
         option_menu.grid(row=3, column=1, padx=self.padx, pady=self.pady, sticky="ew")
 
         separator = ttk.Separator(self.window, orient="horizontal")
@@ -313,6 +378,7 @@ class CreateNewAutoAdd(cf.SubWindow):
         btn2 = ttk.Button(self.button_frame, style="Exit.TButton", text="Cancel", command=self.on_cancel, width=self.btn_width // 2)
         btn1.grid(row=0, column=0, padx=self.padx, pady=self.pady, sticky="ew")
         btn2.grid(row=0, column=1, padx=self.padx, pady=self.pady, sticky="ew")
+        self.show_window()
 
     def on_confirm(self) -> None:
         if not self.filename_var.get():
@@ -353,6 +419,7 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
     def __init__(self, root: tk.Tk, rundirectly: bool = False) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Auto Adder")
@@ -364,7 +431,7 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
             self.window,
             style="TLabel",
             text="Auto adder",
-            font=("TkDefaultFont", 12, "bold"),
+            font=cf.TITLE_FONT,
         )
         label.pack(padx=self.padx, pady=self.pady)
 
@@ -381,23 +448,26 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
             label="Config",
             menu=config_menubar,
         )
+        last_menu_index = self.menubar.index("end")
+        self._menubar_indices = tuple(range(last_menu_index + 1)) if last_menu_index is not None else ()
 
         label = ttk.Label(self.window, text="Please choose an auto adder to run.", anchor="center")
         label.pack(padx=self.padx, pady=self.pady)
 
         cfg_path = os.path.abspath("auto_adder_config")
         self.start_buttons: list[tuple[ttk.Button, Callable, bool | None]] = []
-        for file in os.listdir(cfg_path):
-            if file == "template.json":
-                continue
-            filepath = os.path.join(cfg_path, file)
-            auto_adder.read_settings(filepath)
-            self.add_main_button(filepath)
+        with os.scandir(cfg_path) as entries:
+            for entry in entries:
+                if entry.name in _SKIP_CONFIGS or not entry.name.endswith(".json") or not entry.is_file():  # also skips the seen-ID journals
+                    continue
+                self.add_main_button(entry.path, auto_adder.read_settings(entry.path))
 
         self.progressbar: ttk.Progressbar  # is actually created later
         self.progress_label: ttk.Label
+        self._latest_progress: tuple[str, int, int]  # written by the worker, drawn by _flush_progress
+        self._progress_pending = False
 
-        self.log_display = ScrolledText(self.window, height=10)
+        self.log_display = None  # created by show_log_if_needed once there is something to show
         self.log_visible = False
         self.setup_logging()
 
@@ -409,19 +479,19 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
         self.progressbar = ttk.Progressbar(self.window, length=300, mode="determinate")
         self.progress_label = ttk.Label(self.window, text="Initializing", anchor="center", justify="center")
 
+        self.window.bind("<<RunAllDone>>", lambda _: self.auto_exit())
+        self.show_window()
         if self.rundirectly is True:
             self.run_all_button.invoke()
-            self.window.after(1000, self.auto_exit)
 
     def auto_exit(self) -> None:
-        if self.worker.is_alive():
-            self.window.after(1000, self.auto_exit)
+        if self.rundirectly is not True:
+            return
+        if all(result is True for _, _, result in self.start_buttons):
+            self.on_close()
+            print("auto exited")
         else:
-            if self.rundirectly is True and all(result is True for _, _, result in self.start_buttons):
-                self.on_close()
-                print("auto exited")
-            else:
-                print("Cant auto exit")
+            print("Cant auto exit")
 
     def on_close(self) -> None:
         self.stop_event.set()
@@ -453,28 +523,24 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
             elif result is False:
                 break
         self.enable_buttons()
+        self.window.event_generate("<<RunAllDone>>", when="tail")
 
     def disable_buttons(self) -> None:
         self.disabled_buttons = [btn for btn, _, _ in self.start_buttons]
         for button in self.disabled_buttons:
             button.config(state="disabled")
-        max_index = self.menubar.index("end")
-        assert max_index
-        for i in range(max_index + 1):
+        for i in self._menubar_indices:
             self.menubar.entryconfig(i, state="disabled")
         self.run_all_button.config(command=self.cancel_thread, text="Cancel", style="Exit.TButton")
 
     def enable_buttons(self) -> None:
         for button in self.disabled_buttons:
             button.config(state="normal")
-        max_index = self.menubar.index("end")
-        assert max_index
-        for i in range(max_index + 1):
+        for i in self._menubar_indices:
             self.menubar.entryconfig(i, state="normal")
         self.run_all_button.config(command=self.run_all, text="Run All", style="TButton")
 
-    def add_main_button(self, filepath: str) -> None:
-        cfg = auto_adder.read_settings(filepath)
+    def add_main_button(self, filepath: str, cfg: auto_adder.Settings) -> None:
         button = ttk.Button(self.window, text=cfg.global_settings.name, width=self.btn_width)
         packed = partial(self.use_main_button, filepath=filepath, button=button)
         button.config(command=packed)
@@ -495,8 +561,13 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
             button.config(style="Working.TButton")
             self.progressbar.pack(fill="x", padx=self.padx, pady=self.pady)
             self.progress_label.pack(padx=self.padx, pady=self.pady)
-            for msg, progress, total in auto_adder.process(filepath, self.stop_event):
-                self.window.after(0, self._update_progress, msg, progress, total)
+            for update in auto_adder.process(filepath, self.stop_event):
+                if self.stop_event.is_set():  # don't wait for process() to notice, and don't queue stale progress
+                    raise auto_adder.ThreadStoppedError
+                self._latest_progress = update
+                if not self._progress_pending:
+                    self._progress_pending = True
+                    self.window.after(PROGRESS_INTERVAL_MS, self._flush_progress)
             button.config(style="Success.TButton")
             self.enable_buttons()
             result = True
@@ -511,6 +582,11 @@ class AutoAddWindow(cf.SubWindow):  # pylint:disable=too-many-instance-attribute
             logging.error("Unskippable exception caught - exiting.")
             return False
 
+    def _flush_progress(self) -> None:
+        self._progress_pending = False  # reset before reading, so newer updates schedule another flush
+        if not self.stop_event.is_set():
+            self._update_progress(*self._latest_progress)
+
     def _update_progress(self, msg: str, progress: int, total: int) -> None:
         self.progressbar["maximum"] = total
         self.progressbar["value"] = progress + 1
@@ -521,6 +597,7 @@ class AddToPlaylistWindow(cf.SubWindow):  # pylint:disable=too-many-instance-att
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Add to playlist")
@@ -541,6 +618,7 @@ class AddToPlaylistWindow(cf.SubWindow):  # pylint:disable=too-many-instance-att
         self.selection = tk.IntVar(value=0)
         selection_section.columnconfigure(0, minsize=160)
         selection_section.columnconfigure(1, weight=1)
+        selected = self.selection.get()
         for i, name in enumerate(self.choices):
             ttk.Radiobutton(
                 selection_section,
@@ -553,18 +631,22 @@ class AddToPlaylistWindow(cf.SubWindow):  # pylint:disable=too-many-instance-att
             self.selection_entries[name] = ttk.Entry(
                 selection_section,
                 textvariable=self.sources[name],
-                state="disabled" if self.selection.get() != self.selection_map[name] else "normal",
+                state="disabled" if selected != self.selection_map[name] else "normal",
                 width=self.entry_width,
             )
             self.selection_entries[name].grid(row=i, column=1, sticky="ew", padx=self.padx, pady=self.pady)
         selection_section.pack(anchor="w", fill="x", expand=True)
+        self._last_selection = selected
+        # radio button value -> entry, and the value that shows the upload filter, looked up once for update_entries
+        self._entries_by_value = tuple(self.selection_entries[name] for name in self.choices)
+        self._channel_uploads_value = self.selection_map["Channel Uploads"]
 
         # --- Channel uploads filter options (only visible when 'Channel Uploads' is selected) ---
         self.playlist_filter_frame = ttk.Frame(self.window)
-        self.playlist_filter_options = [("all videos", 0), ("full videos only", 1), ("livestreams only", 2), ("shorts only", 3)]
         self.playlist_filter_var = tk.IntVar(value=0)
         self.playlist_filter_buttons = []
-        for i, (label, val) in enumerate(self.playlist_filter_options):
+        self._filter_visible = False
+        for i, (label, val) in enumerate(_PLAYLIST_FILTER_OPTIONS):
             rb = ttk.Radiobutton(self.playlist_filter_frame, text=label, variable=self.playlist_filter_var, value=val)
             rb.grid(row=0, column=i, sticky="w", padx=(0, 6), pady=self.pady)
             self.playlist_filter_buttons.append(rb)
@@ -581,12 +663,17 @@ class AddToPlaylistWindow(cf.SubWindow):  # pylint:disable=too-many-instance-att
 
         ttk.Label(self.target_section, text="Playlist ID:").grid(row=0, column=0, sticky="w", padx=self.padx, pady=self.pady)
         self.target_playlist_id = tk.StringVar()
+        self._verified_target_id: str | None = None  # last entered target ID that passed verify(), only used by the worker threads
+        self._add_by_source: dict[str, Callable[[str, youtube.Playlist, int], bool]] = {
+            "Video": self._add_video,
+            "Playlist": self._add_playlist,
+            "Channel Uploads": self._add_channel_uploads,
+        }
         ttk.Entry(self.target_section, textvariable=self.target_playlist_id).grid(row=0, column=1, sticky="ew", padx=self.padx, pady=self.pady)
         self.target_section.pack(fill="x", expand=True)
 
         ##### Logging field
-        # Create and pack the log display
-        self.log_display = ScrolledText(self.window, height=10)
+        self.log_display = None  # created by show_log_if_needed once there is something to show
         self.log_visible = False
         self.setup_logging()
 
@@ -599,23 +686,39 @@ class AddToPlaylistWindow(cf.SubWindow):  # pylint:disable=too-many-instance-att
         btn2 = ttk.Button(self.button_frame, style="Exit.TButton", text="Cancel", command=self.on_cancel, width=self.btn_width // 2)
         btn1.grid(row=0, column=0, padx=self.padx, pady=self.pady, sticky="ew")
         btn2.grid(row=0, column=1, padx=self.padx, pady=self.pady, sticky="ew")
+        self.confirm_button = btn1
+        self.show_window()
+
+    def reset(self) -> None:
+        for source in self.sources.values():
+            source.set("")
+        self.target_playlist_id.set("")
+        self.selection.set(0)
+        self.playlist_filter_var.set(0)
+        self.update_entries()
+        self.confirm_button.config(style="Confirm.TButton")
+        super().reset()
 
     def update_entries(self) -> None:
-        for name, entry in self.selection_entries.items():
-            if self.selection.get() != self.selection_map[name]:
-                entry.config(state="disabled")
-            else:
-                entry.config(state="normal")
+        selected = self.selection.get()
+        if selected == self._last_selection:
+            return
+        # only the previously and the newly selected entry change state
+        self._entries_by_value[self._last_selection].config(state="disabled")
+        self._entries_by_value[selected].config(state="normal")
+        self._last_selection = selected
 
         # Show/hide playlist filter radiobuttons above target_section
-        if self.selection.get() == self.selection_map["Channel Uploads"]:
-            self.playlist_filter_frame.pack(anchor="w", padx=self.padx, before=self.separator_above_target)
-        else:
-            self.playlist_filter_frame.pack_forget()
+        show_filter = selected == self._channel_uploads_value
+        if show_filter != self._filter_visible:
+            if show_filter:
+                self.playlist_filter_frame.pack(anchor="w", padx=self.padx, before=self.separator_above_target)
+            else:
+                self.playlist_filter_frame.pack_forget()
+            self._filter_visible = show_filter
 
     def on_cancel(self) -> None:
-        self.window.destroy()
-        self.root.deiconify()
+        self.hide()
 
     def on_confirm(self) -> None:
         source = self.choices[self.selection.get()]
@@ -627,42 +730,74 @@ class AddToPlaylistWindow(cf.SubWindow):  # pylint:disable=too-many-instance-att
         elif not target_id:
             messagebox.showerror("ERROR", "No target playlist ID given. Please enter one before confirming.")
             return
-
-        target = youtube.Playlist(target_id)
-        if not target.verify():
-            messagebox.showerror("ERROR", "The entered target Playlist ID is invalid. Please enter a valid ID!")
+        if not _SOURCE_TYPES[source].has_valid_format(src_id):
+            messagebox.showerror("ERROR", f"The entered source {source} ID is not a valid ID or URL. Please enter a valid ID!")
+            return
+        if not youtube.Playlist.has_valid_format(target_id):
+            messagebox.showerror("ERROR", "The entered target Playlist ID is not a valid ID or URL. Please enter a valid ID!")
             return
 
-        match source:
-            case "Video":
-                v = youtube.Video(src_id)
-                if not v.verify():
-                    messagebox.showerror("ERROR", "The entered source Video ID is invalid. Please enter a valid ID!")
-                    return
-                success = youtube.add_video_to_playlist(src_video_id=v.id, target_playlist=target)
-            case "Playlist":
-                p = youtube.Playlist(src_id)
-                if not p.verify():
-                    messagebox.showerror("ERROR", "The entered source Playlist ID is invalid. Please enter a valid ID!")
-                    return
-                success = youtube.add_playlist_to_playlist(src_playlist=p, target_playlist=target)
-            case "Channel Uploads":
-                c = youtube.Channel(src_id)
-                if not c.verify():
-                    messagebox.showerror("ERROR", "The entered source Channel ID is invalid. Please enter a valid ID!")
+        self.set_button_states("disabled")
+        self.confirm_button.config(style="Working.TButton")
+        args = (source, src_id, target_id, self.playlist_filter_var.get())
+        threading.Thread(target=self._add_to_playlist, args=args, daemon=True).start()
+
+    def _add_to_playlist(self, source: str, src_id: str, target_id: str, playlist_filter: int) -> None:
+        """Runs in a worker thread; the result is handed back to the Tk thread via after()."""
+        try:
+            # built in this worker: a playlist holds the API client of its creating thread, so only the verified ID is kept across runs
+            target = youtube.Playlist(target_id)
+            if self._verified_target_id != target_id:  # skip verify() when the user is retrying with only the source changed
+                if not target.verify():
+                    self.window.after(0, self._fail, "The entered target Playlist ID is invalid. Please enter a valid ID!")
                     return
-                success = youtube.add_channeluploads_to_playlist(
-                    src_channel=c,
-                    target_playlist=target,
-                    full_videos_only=self.playlist_filter_var.get() == 1,
-                    livestreams_only=self.playlist_filter_var.get() == 2,
-                    shorts_only=self.playlist_filter_var.get() == 3,
-                )
+                self._verified_target_id = target_id
+
+            success = self._add_by_source[source](src_id, target, playlist_filter)
+        except youtube.InvalidValueError as error:
+            self.window.after(0, self._fail, str(error))
+            return
+        except youtube.UnskippableError:
+            logging.exception("Unskippable exception caught while adding to playlist.")
+            success = False
+        except Exception:  # pylint:disable=broad-exception-caught  # any failure must hand control back to the Tk thread
+            logging.exception("Exception caught while adding to playlist.")
+            success = False
+        self.window.after(0, self._finish, success)
+
+    # One per source type, all run in the worker thread. Invalid source IDs raise InvalidValueError with the message for the user.
+    def _add_video(self, src_id: str, target: youtube.Playlist, _: int) -> bool:
+        v = youtube.Video(src_id)
+        if not v.verify():
+            raise youtube.InvalidValueError("The entered source Video ID is invalid. Please enter a valid ID!")
+        return youtube.add_video_to_playlist(src_video_id=v.id, target_playlist=target)
+
+    def _add_playlist(self, src_id: str, target: youtube.Playlist, _: int) -> bool:
+        p = youtube.Playlist(src_id)
+        if not p.verify():
+            raise youtube.InvalidValueError("The entered source Playlist ID is invalid. Please enter a valid ID!")
+        return youtube.add_playlist_to_playlist(src_playlist=p, target_playlist=target)
+
+    def _add_channel_uploads(self, src_id: str, target: youtube.Playlist, playlist_filter: int) -> bool:
+        c = youtube.Channel(src_id)
+        if not c.verify():
+            raise youtube.InvalidValueError("The entered source Channel ID is invalid. Please enter a valid ID!")
+        # the filter radio buttons are numbered in the same order as ChannelUploadFilter
+        filter_kwargs = auto_adder.SELECTOR_KWARGS[_FILTER_OPTIONS[playlist_filter]]
+        return youtube.add_channeluploads_to_playlist(src_channel=c, target_playlist=target, **filter_kwargs)
+
+    def _fail(self, message: str) -> None:
+        self.set_button_states("normal")
+        self.confirm_button.config(style="Confirm.TButton")
+        messagebox.showerror("ERROR", message)
+
+    def _finish(self, success: bool) -> None:
         if success:
             messagebox.showinfo("Adding video(s) was successfull!", "All videos have been successfully added to your target playlist!")
-            self.window.destroy()
-            self.root.deiconify()
+            self.hide()
         else:
+            self.set_button_states("normal")
+            self.confirm_button.config(style="Confirm.TButton")
             messagebox.showerror(
                 "Adding video(s) was unsuccessfull!", "Unfortunately, there has been an issue with adding all videos to your target playlist :("
             )
@@ -672,6 +807,7 @@ class DownloadChannelIconWindow(cf.SubWindow):
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Download Channel Icon")
@@ -734,6 +870,7 @@ class DownloadChannelIconWindow(cf.SubWindow):
             command=self.download,
         )
         self.download_button.grid(row=4, column=0, columnspan=3, sticky="ew", padx=self.padx, pady=self.pady)
+        self.show_window()
 
     def on_text_change(self, *_: Any) -> None:
         if self.channel_var.get() and self.downloadlocation_var.get() and self.downloadlocation_var.get() != self.dl_null:
@@ -762,6 +899,7 @@ class RemovePlaylistEntriesUpToIndex(cf.SubWindow):  # pylint:disable=too-many-i
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.window = tk.Toplevel(self.root)
+        self.window.withdraw()  # build everything hidden, so the window is laid out once
         cf.tk_root_styles(self.window)
         self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.window.title("Remove Playlist entries up to index")
@@ -787,8 +925,7 @@ class RemovePlaylistEntriesUpToIndex(cf.SubWindow):  # pylint:disable=too-many-i
         self.source_section.pack(fill="x", expand=True)
 
         ##### Logging field
-        # Create and pack the log display
-        self.log_display = ScrolledText(self.window, height=10)
+        self.log_display = None  # created by show_log_if_needed once there is something to show
         self.log_visible = False
         self.setup_logging()
 
@@ -801,20 +938,25 @@ class RemovePlaylistEntriesUpToIndex(cf.SubWindow):  # pylint:disable=too-many-i
         btn2 = ttk.Button(self.button_frame, style="Exit.TButton", text="Cancel", command=self.on_cancel, width=self.btn_width // 2)
         btn1.grid(row=0, column=0, padx=self.padx, pady=self.pady, sticky="ew")
         btn2.grid(row=0, column=1, padx=self.padx, pady=self.pady, sticky="ew")
+        self.confirm_button = btn1
+        self.show_window()
+
+    def reset(self) -> None:
+        self.source_playlist_id.set("")
+        self.index.set(0)
+        self.confirm_button.config(style="Confirm.TButton")
+        super().reset()
 
     def on_cancel(self) -> None:
-        self.window.destroy()
-        self.root.deiconify()
+        self.hide()
 
     def on_confirm(self) -> None:
         source_id = self.source_playlist_id.get()
         if not source_id:
             messagebox.showerror("ERROR", "No source playlist ID given. Please enter one before confirming.")
             return
-
-        source = youtube.Playlist(source_id)
-        if not source.verify():
-            messagebox.showerror("ERROR", "The entered source Playlist ID is invalid. Please enter a valid ID!")
+        if not youtube.Playlist.has_valid_format(source_id):
+            messagebox.showerror("ERROR", "The entered source Playlist ID is not a valid ID or URL. Please enter a valid ID!")
             return
 
         index = self.index.get()
@@ -822,19 +964,41 @@ class RemovePlaylistEntriesUpToIndex(cf.SubWindow):  # pylint:disable=too-many-i
             messagebox.showerror("ERROR", "You need to remove atleast 1 video!")
             return
 
-        success = True
-        for i, video_elem in enumerate(source.yield_elements(["id"])):
-            video_count = i + 1
-            if video_count > index:
-                break
-            vp_id = video_elem["id"]
-            success = bool(success * source.remove_video(video_playlist_id=vp_id))
+        self.set_button_states("disabled")
+        self.confirm_button.config(style="Working.TButton")
+        threading.Thread(target=self._remove_entries, args=(source_id, index), daemon=True).start()
 
+    def _remove_entries(self, source_id: str, index: int) -> None:
+        """Runs in a worker thread; the result is handed back to the Tk thread via after()."""
+        try:
+            source = youtube.Playlist(source_id)
+            if not source.verify():
+                self.window.after(0, self._fail, "The entered source Playlist ID is invalid. Please enter a valid ID!")
+                return
+
+            # collect first: deleting while paging through the playlist would shift later pages and skip entries
+            vp_ids = [video_elem["id"] for video_elem in source.yield_elements(["id"], limit=index)]
+            success = source.remove_videos(vp_ids)
+        except youtube.UnskippableError:
+            logging.exception("Unskippable exception caught while removing playlist entries.")
+            success = False
+        except Exception:  # pylint:disable=broad-exception-caught  # any failure must hand control back to the Tk thread
+            logging.exception("Exception caught while removing playlist entries.")
+            success = False
+        self.window.after(0, self._finish, success)
+
+    def _fail(self, message: str) -> None:
+        self.set_button_states("normal")
+        self.confirm_button.config(style="Confirm.TButton")
+        messagebox.showerror("ERROR", message)
+
+    def _finish(self, success: bool) -> None:
         if success:
             messagebox.showinfo("Removing video(s) was successfull!", "All videos have been successfully removed from your target playlist!")
-            self.window.destroy()
-            self.root.deiconify()
+            self.hide()
         else:
+            self.set_button_states("normal")
+            self.confirm_button.config(style="Confirm.TButton")
             messagebox.showerror(
                 "Removing video(s) was unsuccessfull!", "Unfortunately, there has been an issue with removing all videos from your target playlist :("
             )
@@ -847,6 +1011,7 @@ class MainMenu:
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.root.title("YouTube manager")
         self.btn_width: int = 50
+        self._tool_windows: dict[type, AddToPlaylistWindow | RemovePlaylistEntriesUpToIndex] = {}
 
         self.menubar = tk.Menu(self.root)
         self.menubar.config()
@@ -876,9 +1041,18 @@ Additional resources:
 http.cat/status/204 - Placeholder image for Simple Video Player"""
         messagebox.showinfo(title="About", message=msg)
 
-    def add_to_playlist_window(self) -> None:
+    def _show_tool_window(self, window_class: type[AddToPlaylistWindow | RemovePlaylistEntriesUpToIndex]) -> None:
+        """These windows are only hidden when closed, so reopening them reuses the existing widgets."""
         self.root.withdraw()
-        AddToPlaylistWindow(self.root)
+        existing = self._tool_windows.get(window_class)
+        if existing is not None and existing.window.winfo_exists():
+            existing.reset()
+            existing.window.deiconify()
+        else:
+            self._tool_windows[window_class] = window_class(self.root)
+
+    def add_to_playlist_window(self) -> None:
+        self._show_tool_window(AddToPlaylistWindow)
 
     def auto_add_window(self) -> None:
         self.root.withdraw()
@@ -889,10 +1063,11 @@ http.cat/status/204 - Placeholder image for Simple Video Player"""
         DownloadChannelIconWindow(self.root)
 
     def remove_playlist_entries(self) -> None:
-        self.root.withdraw()
-        RemovePlaylistEntriesUpToIndex(self.root)
+        self._show_tool_window(RemovePlaylistEntriesUpToIndex)
 
     def simple_video_player(self) -> None:
+        from simple_video_player import VideoPlayer  # pylint:disable=import-outside-toplevel # pulls in vlc, yt_dlp, PIL and pynput
+
         self.root.withdraw()
         VideoPlayer(self.root)
 
@@ -901,6 +1076,8 @@ http.cat/status/204 - Placeholder image for Simple Video Player"""
 
 
 def custom_title_bar(root: tk.Tk | tk.Toplevel, title: str = "testing") -> None:
+    fg, bg3, red2, red4 = colors["fg"], colors["bg-3"], colors["red-2"], colors["red-4"]
+
     def start_move(event: Any) -> None:
         root._offset_x = event.x_root - root.winfo_x()  # type:ignore #pylint:disable=protected-access
         root._offset_y = event.y_root - root.winfo_y()  # type:ignore #pylint:disable=protected-access
@@ -915,10 +1092,10 @@ def custom_title_bar(root: tk.Tk | tk.Toplevel, title: str = "testing") -> None:
         root._offset_y = 0  # type:ignore #pylint:disable=protected-access
 
     def close_button_on_enter(_: Any) -> None:
-        close_button["background"] = colors["red-4"]
+        close_button["background"] = red4
 
     def close_button_on_leave(_: Any) -> None:
-        close_button["background"] = colors["bg-3"]
+        close_button["background"] = bg3
 
     title_bar = ttk.Frame(root, style="Titlebar.TFrame")
     title_bar.pack(fill="x", side="top")
@@ -930,10 +1107,10 @@ def custom_title_bar(root: tk.Tk | tk.Toplevel, title: str = "testing") -> None:
         title_bar,
         text="X",
         command=root.destroy,
-        foreground=colors["fg"],
-        background=colors["bg-3"],
-        activeforeground=colors["fg"],
-        activebackground=colors["red-2"],
+        foreground=fg,
+        background=bg3,
+        activeforeground=fg,
+        activebackground=red2,
         borderwidth=0,
         width=6,
     )
@@ -944,9 +1121,9 @@ def custom_title_bar(root: tk.Tk | tk.Toplevel, title: str = "testing") -> None:
     title_bar.bind("<ButtonRelease-1>", stop_move)
     title_bar.bind("<Button-1>", start_move)
     title_bar.bind("<B1-Motion>", do_move)
-    title_label.bind("<ButtonRelease-1>", stop_move)
-    title_label.bind("<Button-1>", start_move)
-    title_label.bind("<B1-Motion>", do_move)
+    # let the label use the title bar's bindings instead of registering the same callbacks again
+    label_tags = title_label.bindtags()
+    title_label.bindtags((label_tags[0], str(title_bar), *label_tags[1:]))
 
 
 def main() -> None:
@@ -957,14 +1134,35 @@ def main() -> None:
         action="store_true",
         help="Runs the auto adder immediately, starts all and exits automatically if no errors were detected.",
     )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Profiles the whole session (startup included) with cProfile and writes the stats to FILE, e.g. for snakeviz.",
+    )
     args = parser.parse_args()
 
-    youtube.Youtube()  # verifies credentials
-    root = tk.Tk()
-    cf.ttk_styles(root)
-    MainMenu(root)
-
-    if args.automaticautoadder is True:
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            run(args.automaticautoadder)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+    else:
+        run(args.automaticautoadder)
+
+
+def run(automaticautoadder: bool) -> None:
+    auto_adder.check_config_dir()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        credentials_checked = executor.submit(youtube.Youtube)  # verifies credentials while the GUI is being built
+        root = tk.Tk()
+        cf.ttk_styles(root)
+        MainMenu(root)
+        credentials_checked.result()
+
+    if automaticautoadder is True:
         root.withdraw()
         AutoAddWindow(root, True)
 
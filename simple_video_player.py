@@ -6,20 +6,45 @@ import platform
 import threading
 import time
 import tkinter as tk
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import filedialog, messagebox, simpledialog, ttk
 from typing import Any, TypedDict
-from urllib.parse import unquote, urlparse
+from urllib.parse import parse_qs, unquote, urlparse
 
 import requests
 import vlc
 import yt_dlp
+from dotenv import load_dotenv
 from PIL import Image, ImageTk
-from pynput.keyboard import Listener
+from pynput.keyboard import Key, Listener
+from requests.adapters import HTTPAdapter
 
 import centralfunctions as cf
 import youtube
 from colors import colors
 
+# Shared session so repeated downloads reuse the connection to the local JDownloader2 instance
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+# How many yt-dlp extractions run ahead while enqueueing a playlist
+STREAM_WORKERS = 4
+# How many extracted videos are handed to VLC at once
+ADD_BATCH_SIZE = 8
+# What get_yt_stream raises for a single unplayable video (private, removed, region-locked, no usable format)
+STREAM_ERRORS = (yt_dlp.utils.DownloadError, KeyError)
+
+# get_yt_stream results by video ID, kept until shortly before the stream URLs expire (googlevideo URLs carry an
+# "expire" timestamp); STREAM_CACHE_TTL is the fallback lifetime when a URL doesn't say
+STREAM_CACHE_SIZE = 256
+STREAM_CACHE_TTL = 5400
+STREAM_EXPIRY_MARGIN = 600
+_stream_cache: OrderedDict[str, tuple[float, tuple[str, str, YouTubeMetaData]]] = OrderedDict()
+_stream_cache_lock = threading.Lock()
+# YoutubeDL isn't thread-safe, but get_yt_stream runs in several pool threads at once
+_ydl_local = threading.local()
+
 
 class YouTubeMetaData(TypedDict):
     title: str
@@ -27,102 +52,130 @@ class YouTubeMetaData(TypedDict):
     thumbnail_url: str
 
 
+def _youtube_dl() -> yt_dlp.YoutubeDL:
+    """Returns this thread's YoutubeDL, so extractors and player JS are only loaded once per thread instead of per video."""
+    ydl: yt_dlp.YoutubeDL | None = getattr(_ydl_local, "ydl", None)
+    if ydl is None:
+        ydl_opts = {
+            "format": "bestvideo+bestaudio/best",
+            "quiet": True,
+            "noplaylist": True,
+            # the adaptive formats come with the player response already, the DASH manifest would only be an extra request
+            "youtube_include_dash_manifest": False,
+        }
+        ydl = _ydl_local.ydl = yt_dlp.YoutubeDL(ydl_opts)
+    return ydl
+
+
 def get_yt_stream(youtube_url: str) -> tuple[str, str, YouTubeMetaData]:
     """
     Given a YouTube URL, returns a tuple of (best_video_url, best_audio_url)
     suitable for VLC input-slave playback.
+    Recent results are reused from an LRU cache keyed by video ID.
     """
-    ydl_opts = {
-        "format": "bestvideo+bestaudio/best",
-        "quiet": True,
-        "noplaylist": True,
-    }
-
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(youtube_url, download=False)
-        meta = YouTubeMetaData(
-            title=info["title"],
-            uploader=info["uploader"],
-            thumbnail_url=info["thumbnail"],
-        )
-
-        # If DASH, 'formats' will contain separate video/audio streams
-        best_video = None
-        best_audio = None
-
-        for f in info.get("formats", []):
-            if f.get("vcodec") != "none":
-                height = f.get("height") or 0
-                if best_video is None or height > (best_video.get("height") or 0):
-                    best_video = f
-            if f.get("acodec") != "none":
-                abr = f.get("abr") or 0
-                best_abr = best_audio.get("abr") if best_audio else 0
-                if best_audio is None or abr > best_abr:
-                    best_audio = f
-
-        if not best_video or not best_audio:
-            # fallback if no DASH detected
-            return info["url"], info["url"], meta
-
+    matched = youtube.Youtube.VIDEO_PATTERN.match(youtube_url)
+    key = matched.group(1) if matched else youtube_url
+    with _stream_cache_lock:
+        cached = _stream_cache.get(key)
+        if cached is not None and time.time() < cached[0]:
+            _stream_cache.move_to_end(key)
+            return cached[1]
+
+    stream = _extract_yt_stream(youtube_url)
+    with _stream_cache_lock:
+        _stream_cache[key] = (_stream_deadline(stream[0], stream[1]), stream)
+        _stream_cache.move_to_end(key)
+        if len(_stream_cache) > STREAM_CACHE_SIZE:
+            _stream_cache.popitem(last=False)
+    return stream
+
+
+def _stream_deadline(*urls: str) -> float:
+    """Returns the time until which the given stream URLs can be reused."""
+    expiries = []
+    for url in urls:
+        expire = parse_qs(urlparse(url).query).get("expire")
+        if expire and expire[0].isdigit():
+            expiries.append(int(expire[0]) - STREAM_EXPIRY_MARGIN)
+    return min(expiries) if expiries else time.time() + STREAM_CACHE_TTL
+
+
+def _extract_yt_stream(youtube_url: str) -> tuple[str, str, YouTubeMetaData]:
+    ydl = _youtube_dl()
+    info = ydl.extract_info(youtube_url, download=False)
+    meta = YouTubeMetaData(
+        title=info["title"],
+        uploader=info["uploader"],
+        thumbnail_url=info["thumbnail"],
+    )
+
+    # yt-dlp already picked the video+audio pair for "bestvideo+bestaudio"
+    requested = info.get("requested_formats")
+    if requested and len(requested) == 2:
+        best_video, best_audio = requested if requested[0].get("vcodec") != "none" else requested[::-1]
         return best_video["url"], best_audio["url"], meta
 
+    # otherwise the "best" fallback matched a single format that carries both video and audio
+    return info["url"], info["url"], meta
+
 
-def get_current_vlc_list_index(media_list_player: vlc.MediaListPlayer, playlist: vlc.MediaList) -> int | None:
+def get_current_vlc_list_index(
+    media_list_player: vlc.MediaListPlayer,
+    playlist: vlc.MediaList,
+    mrl_index: dict[str, int] | None = None,
+) -> int | None:
+    """Returns the playlist index of the playing media.
+    With mrl_index (MRL -> first index, kept up to date by the caller) this is a single lookup instead of a playlist scan.
+    """
     current = media_list_player.get_media_player().get_media()
-    if current is not None:
-        for i in range(playlist.count()):
-            if playlist.item_at_index(i).get_mrl() == current.get_mrl():
-                return i
+    if current is None:
+        return None
+    current_mrl = current.get_mrl()
+    if mrl_index is not None:
+        return mrl_index.get(current_mrl)
+    for i in range(playlist.count()):
+        if playlist.item_at_index(i).get_mrl() == current_mrl:
+            return i
     return None
 
 
-def wait_for_event_once(em: vlc.EventManager, event_type: Any) -> None:
-    """Block until the given VLC event fires once, then return."""
-    done = threading.Event()
-
-    def _callback(_event: Any, _data: Any) -> None:
-        done.set()
-
-    em.event_attach(event_type, _callback, None)
-    try:
-        done.wait()
-    finally:
-        em.event_detach(event_type)
-
-
 class PlaylistFrame(ttk.Frame):  # pylint:disable=too-many-ancestors
     def __init__(
         self,
         parent: tk.Tk | tk.Toplevel,
-        media_list_player: vlc.MediaListPlayer,
-        playlist: vlc.MediaList,
         *args: Any,
         max_rows: int = 6,
+        mrl_index: dict[str, int] | None = None,
         **kwargs: Any,
     ) -> None:
         self.parent = parent
         super().__init__(self.parent, *args, **kwargs)
-        self.media_list_player = media_list_player
-        self.playlist = playlist
-        self.labels: list[ttk.Label] = []
+        # set by attach() once the player has created VLC
+        self.media_list_player: vlc.MediaListPlayer | None = None
+        self.playlist: vlc.MediaList | None = None
+        self.mrl_index = mrl_index
         self.label_bg: str | None = None
         self.more_videos_pending = False
 
         self.max_rows = max_rows
         self.row_height: int | None = None
+        self.scroll_offset = 0
+        self._refresh_pending = False
         self.canvas = tk.Canvas(self, height=0, bg=colors["bg-3"])
-        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
         self.scrollable_frame = ttk.Frame(self.canvas)
 
         # Add scrollable frame inside canvas
         self.canvas_window = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
 
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        # Fixed pool of labels; refreshing only swaps their text/style around the visible window
+        self.labels = [ttk.Label(self.scrollable_frame, anchor="w", padding=(4, 0)) for _ in range(max_rows + 2)]
+        self._label_state: list[tuple[str, str] | None] = [None] * len(self.labels)
+
         self.canvas.bind("<Configure>", self.resize_frame)
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)  # Windows/macOS
-        self.canvas.bind_all("<Button-4>", lambda _: self.canvas.yview_scroll(-1, "units"))  # Linux
-        self.canvas.bind_all("<Button-5>", lambda _: self.canvas.yview_scroll(1, "units"))  # Linux
+        # Wheel events go to the focused widget, so only grab them globally while the pointer is over the playlist
+        self.bind("<Enter>", self._bind_wheel)
+        self.bind("<Leave>", self._unbind_wheel)
 
         # Layout
         self.grid_rowconfigure(0, weight=1)
@@ -133,15 +186,62 @@ class PlaylistFrame(ttk.Frame):  # pylint:disable=too-many-ancestors
 
         self.refresh_playlist()
 
+    def attach(self, media_list_player: vlc.MediaListPlayer, playlist: vlc.MediaList) -> None:
+        """Connects the frame to the VLC playlist it displays."""
+        self.media_list_player = media_list_player
+        self.playlist = playlist
+
+        # VLC fires these on its own thread, so they only schedule a refresh on the Tk thread
         self.event_manager = self.media_list_player.event_manager()
-        self.event_manager.event_attach(vlc.EventType.MediaListPlayerNextItemSet, self.refresh_playlist)
+        self.event_manager.event_attach(vlc.EventType.MediaListPlayerNextItemSet, self._on_vlc_event)
+        self.player_event_manager = self.media_list_player.get_media_player().event_manager()
+        self.player_event_manager.event_attach(vlc.EventType.MediaPlayerMediaChanged, self._on_vlc_event)
+        self.playlist_event_manager = self.playlist.event_manager()
+        self.playlist_event_manager.event_attach(vlc.EventType.MediaListItemAdded, self._on_vlc_event)
+        self.playlist_event_manager.event_attach(vlc.EventType.MediaListItemDeleted, self._on_vlc_event)
+        self.schedule_refresh()
 
     def resize_frame(self, event: Any) -> None:
         self.canvas.itemconfig(self.canvas_window, width=event.width)
 
+    def _bind_wheel(self, _event: Any) -> None:
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)  # Windows/macOS
+        self.canvas.bind_all("<Button-4>", lambda _: self._scroll_rows(-1))  # Linux
+        self.canvas.bind_all("<Button-5>", lambda _: self._scroll_rows(1))  # Linux
+
+    def _unbind_wheel(self, event: Any) -> None:
+        if event.detail == "NotifyInferior":  # the pointer only moved onto a child (canvas, row label), it is still over the playlist
+            return
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.unbind_all(sequence)
+
     def _on_mousewheel(self, event: Any) -> None:
         # For Windows/macOS
-        self.canvas.yview_scroll(int(-2 * (event.delta / 120)), "units")
+        self._scroll_rows(int(-2 * (event.delta / 120)))
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        """Translate scrollbar drags/clicks into a row offset of the virtual list."""
+        first, total = self._visible_range()
+        if action == "moveto":
+            self._scroll_rows(int(float(amount) * total) - first)
+        elif unit == "pages":
+            self._scroll_rows(int(amount) * self.max_rows)
+        else:
+            self._scroll_rows(int(amount))
+
+    def _on_vlc_event(self, _event: Any) -> None:
+        self.schedule_refresh()
+
+    def schedule_refresh(self) -> None:
+        """Thread-safe; coalesces bursts of requests into one refresh_playlist on the Tk thread."""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.parent.after(0, self.refresh_playlist)
+
+    def _scroll_rows(self, rows: int) -> None:
+        if rows:
+            self.scroll_offset += rows
+            self.refresh_playlist()
 
     def _update_scrollregion(self) -> None:
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -155,43 +255,52 @@ class PlaylistFrame(ttk.Frame):  # pylint:disable=too-many-ancestors
             max_height = self.max_rows * self.row_height
             self.canvas.config(height=min(self.scrollable_frame.winfo_reqheight(), max_height))
 
-    def refresh_playlist(self, _: Any | None = None, counter: int = 0) -> None:
-        """Read playlist items and display them as labels."""
-        # clear existing labels
-        for lbl in self.labels:
-            lbl.destroy()
-        self.labels.clear()
-
-        current_index = get_current_vlc_list_index(media_list_player=self.media_list_player, playlist=self.playlist)
-        for i in range(self.playlist.count()):
-            if current_index and i < current_index - 1:
+    def _visible_range(self, current_index: int | None = None) -> tuple[int, int]:
+        """Returns (first row shown, total row count), keeping scroll_offset within bounds."""
+        assert self.media_list_player is not None and self.playlist is not None  # not truthiness: an empty MediaList is falsy
+        total = self.playlist.count() + (1 if self.more_videos_pending else 0)
+        if current_index is None:
+            current_index = get_current_vlc_list_index(self.media_list_player, self.playlist, self.mrl_index)
+        anchor = max(current_index - 1, 0) if current_index else 0
+        last_first = max(total - self.max_rows, 0)
+        self.scroll_offset = min(max(self.scroll_offset, -anchor), last_first - anchor)
+        return anchor + self.scroll_offset, total
+
+    def _row(self, i: int, current_index: int | None) -> tuple[str, str]:
+        assert self.playlist is not None
+        if i == self.playlist.count():
+            return "More videos pending... ", "TLabel"
+        media: vlc.Media = self.playlist.item_at_index(i)
+        title = media.get_meta(vlc.Meta.Title) or media.get_mrl()
+        artist = media.get_meta(vlc.Meta.Artist) or "Unknown Artist"
+        style = "Selected.TLabel" if i == current_index else "TLabel"
+        return f"{i+1}: {artist} - {title}", style
+
+    def refresh_playlist(self) -> None:
+        """Show the playlist rows around the current item in the pooled labels."""
+        self._refresh_pending = False
+        if self.media_list_player is None or self.playlist is None:
+            return
+        current_index = get_current_vlc_list_index(self.media_list_player, self.playlist, self.mrl_index)
+        first, total = self._visible_range(current_index)
+        for slot, lbl in enumerate(self.labels):
+            i = first + slot
+            state = self._row(i, current_index) if i < total else None
+            if state == self._label_state[slot]:
                 continue
+            if state is None:
+                lbl.pack_forget()
+            else:
+                lbl.configure(text=state[0], style=state[1])
+                if self._label_state[slot] is None:
+                    lbl.pack(fill="x", expand=True)
+            self._label_state[slot] = state
 
-            media: vlc.Media = self.playlist.item_at_index(i)
-            if media:
-                title = media.get_meta(vlc.Meta.Title) or media.get_mrl()
-                artist = media.get_meta(vlc.Meta.Artist) or "Unknown Artist"
-                label_text = f"{i+1}: {artist} - {title}"
-                lbl = ttk.Label(self.scrollable_frame, text=label_text, anchor="w", padding=(4, 0))
-                lbl.pack(fill="x", expand=True)
-                self.labels.append(lbl)
-
-                if current_index is not None and i == current_index:
-                    lbl.configure(style="Selected.TLabel")
-                else:
-                    lbl.configure(style="TLabel")
-
-        if self.more_videos_pending is True:
-            label_text = "More videos pending... "
-            lbl = ttk.Label(self.scrollable_frame, text=label_text, anchor="w", padding=(4, 0))
-            lbl.pack(fill="x", expand=True)
-            self.labels.append(lbl)
-        if self.labels and self.canvas.winfo_manager() == "":
-            self.canvas.grid(row=0, column=0, sticky="nsew")
-            self.scrollbar.grid(row=0, column=1, sticky="ns")
-
-        if counter < 4:
-            self.parent.after(1000, self.refresh_playlist, None, counter + 1)
+        if total:
+            self.scrollbar.set(first / total, min(first + self.max_rows, total) / total)
+            if self.canvas.winfo_manager() == "":
+                self.canvas.grid(row=0, column=0, sticky="nsew")
+                self.scrollbar.grid(row=0, column=1, sticky="ns")
 
 
 class VideoPlayer(cf.SubWindow):
@@ -203,15 +312,20 @@ class VideoPlayer(cf.SubWindow):
         self.window.title("Video Player")
         self.window.minsize(640, 540)
 
-        # VLC stuff
-        self._instance: vlc.Instance = vlc.Instance()
-        self._player: vlc.MediaPlayer = vlc.MediaPlayer()
-        # playlist
-        self.media_list_player: vlc.MediaListPlayer = vlc.MediaListPlayer(self._instance)
-        self.playlist: vlc.MediaList = vlc.MediaList(self._instance)
-        # connect playlist to the rest of the API
-        self.media_list_player.set_media_player(self._player)
-        self.media_list_player.set_media_list(self.playlist)
+        # VLC stuff, created by _ensure_vlc() when the first media is added since libvlc takes a while to start
+        self._vlc_ready = False
+        self._instance: vlc.Instance
+        self._player: vlc.MediaPlayer
+        self.media_list_player: vlc.MediaListPlayer
+        self.playlist: vlc.MediaList
+        # MRL -> first playlist index; media is only ever appended, so this never needs rebuilding
+        self._mrl_to_index: dict[str, int] = {}
+        # the Python side of a VLC event manager has to stay alive for as long as its callbacks can fire
+        self._media_event_managers: list[vlc.EventManager] = []
+        # set whenever VLC moves to another playlist item; lets the YouTube enqueue loop wait for room
+        self._item_advanced = threading.Event()
+        # runs the yt-dlp extractions for everything added from YouTube
+        self._stream_pool = ThreadPoolExecutor(max_workers=STREAM_WORKERS)
 
         # Layout
         self.window.grid_rowconfigure(0, weight=1)  # Video row expands
@@ -222,6 +336,9 @@ class VideoPlayer(cf.SubWindow):
         self.video_frame.grid(row=0, column=0, sticky="nsew")
         self.placeholder_img: Image.Image | None = None
         self.placeholder_photo: ImageTk.PhotoImage
+        self._placeholder_cache: dict[tuple[int, int], ImageTk.PhotoImage] = {}
+        self._last_size = (0, 0)
+        self._resize_pending = False
         self.set_placeholder_into_video_frame()
         self.video_frame.bind("<Configure>", self.resize_placeholder)
         self.controls = ttk.Frame(self.window)
@@ -237,11 +354,6 @@ class VideoPlayer(cf.SubWindow):
             command=self.toggle_play,
             width=self.mediabtn_width,
         )
-        self.event_manager = self._player.event_manager()
-        self.event_manager.event_attach(vlc.EventType.MediaPlayerPlaying, self.on_playing)
-        self.event_manager.event_attach(vlc.EventType.MediaPlayerPaused, self.on_paused)
-        self.event_manager.event_attach(vlc.EventType.MediaPlayerStopped, self.on_paused)
-
         stop_btn = ttk.Button(
             self.controls,
             text="⏹",
@@ -298,7 +410,7 @@ class VideoPlayer(cf.SubWindow):
             troughcolor=colors["bg-6"],
             border=0,
         )
-        self.volume_slider.set(self._player.audio_get_volume())  # start at current volume
+        self.volume_slider.set(100)
 
         previous_btn.pack(side="left", padx=5, pady=5)
         self.playpause_btn.pack(side="left", padx=5, pady=5)
@@ -309,29 +421,58 @@ class VideoPlayer(cf.SubWindow):
         self.download_btn.pack(side="left", padx=5, pady=5)
         self.volume_slider.pack(side="left", padx=5, pady=5)
 
-        self.playlist_frame = PlaylistFrame(self.window, self.media_list_player, self.playlist)
+        self.playlist_frame = PlaylistFrame(self.window, mrl_index=self._mrl_to_index)
         self.playlist_frame.grid(row=3, column=0, sticky="ew")
 
-        self._embed_vlc()
         self.media_keys()
         self.print_that_shit()
 
+    def _ensure_vlc(self) -> None:
+        """Creates the VLC instance, player and playlist on first use. Must run on the Tk thread."""
+        if self._vlc_ready:
+            return
+        self._instance = vlc.Instance()
+        self._player = self._instance.media_player_new()
+        # playlist
+        self.media_list_player = self._instance.media_list_player_new()
+        self.playlist = self._instance.media_list_new()
+        # connect playlist to the rest of the API
+        self.media_list_player.set_media_player(self._player)
+        self.media_list_player.set_media_list(self.playlist)
+
+        self.event_manager = self._player.event_manager()
+        self.event_manager.event_attach(vlc.EventType.MediaPlayerPlaying, self.on_playing)
+        self.event_manager.event_attach(vlc.EventType.MediaPlayerPaused, self.on_paused)
+        self.event_manager.event_attach(vlc.EventType.MediaPlayerStopped, self.on_paused)
+        self.list_event_manager = self.media_list_player.event_manager()
+        self.list_event_manager.event_attach(vlc.EventType.MediaListPlayerNextItemSet, lambda _: self._item_advanced.set())
+
+        self.playlist_frame.attach(self.media_list_player, self.playlist)
+        self._embed_vlc()
+        self._vlc_ready = True
+        self._player.audio_set_volume(self.volume_slider.get())
+
     def set_volume(self, val: str) -> None:
+        if not self._vlc_ready:
+            return  # applied by _ensure_vlc()
         volume = int(val)
         self._player.audio_set_volume(volume)
 
     def on_close(self) -> None:
-        if hasattr(self, "media_list_player"):  # make sure the VLC player exists
+        if getattr(self, "_vlc_ready", False):  # make sure the VLC player exists
             self.media_list_player.stop()
+        if hasattr(self, "_stream_pool"):
+            self._stream_pool.shutdown(wait=False, cancel_futures=True)
         super().on_close()
 
     def media_keys(self) -> None:
+        # pynput calls this from its own thread for every key pressed system-wide
         def on_press(key: Any) -> None:
-            if str(key) == "Key.media_play_pause":
-                self.toggle_play()
-            elif str(key) == "Key.media_next":
-                self.next()
-            elif str(key) == "Key.media_previous":
+            if key is Key.media_play_pause:
+                self.window.after(0, self.toggle_play)
+            elif key is Key.media_next:
+                self.window.after(0, self.next)
+            elif key is Key.media_previous:
                 pass  # print('yeet3')# previous key was pressed
 
         listener_thread = Listener(on_press=on_press, on_release=None)
@@ -339,35 +480,50 @@ class VideoPlayer(cf.SubWindow):
 
     def set_placeholder_into_video_frame(self) -> None:
         if self.placeholder_img is None:
-            self.placeholder_img = Image.open("assets/video_placeholder.jpg")
+            img = Image.open("assets/video_placeholder.jpg")
+            img.draft("RGB", (1024, 1024))  # lets libjpeg decode at a reduced scale if the file is huge
+            self.placeholder_img = img.convert("RGB")
             print("yeet")
         self.placeholder_photo = ImageTk.PhotoImage(self.placeholder_img)
         self.placeholder_label = ttk.Label(self.video_frame, image=self.placeholder_photo)
         self.placeholder_label.place(relx=0.5, rely=0.5, anchor="center")  # center it
 
     def resize_placeholder(self, event: Any) -> None:
+        # <Configure> fires continuously while dragging; only rescale once things settle down
+        self._last_size = (event.width, event.height)
+        if not self._resize_pending:
+            self._resize_pending = True
+            self.window.after(16, self._apply_resize)
+
+    def _apply_resize(self) -> None:
+        self._resize_pending = False
         # Original image size
         assert self.placeholder_img
         orig_w, orig_h = self.placeholder_img.size
-        frame_w, frame_h = event.width, event.height
+        frame_w, frame_h = self._last_size
 
-        # Compute scaling factor to fit inside the frame while keeping aspect ratio
+        # Compute scaling factor to fit inside the frame while keeping aspect ratio,
+        # snapped to a 16px grid so the cache below stays small
         scale = min(frame_w / orig_w, frame_h / orig_h)
-        new_w = int(orig_w * scale)
-        new_h = int(orig_h * scale)
+        new_w = max(int(orig_w * scale) // 16 * 16, 16)
+        new_h = max(int(orig_h * scale) // 16 * 16, 16)
 
         # Resize
-        resized = self.placeholder_img.resize((new_w, new_h), Image.Resampling.BILINEAR)
-        self.placeholder_photo = ImageTk.PhotoImage(resized)  # keep reference
+        photo = self._placeholder_cache.get((new_w, new_h))
+        if photo is None:
+            if new_w <= orig_w and new_h <= orig_h:
+                resized = self.placeholder_img.copy()
+                resized.thumbnail((new_w, new_h), Image.Resampling.BILINEAR)
+            else:  # thumbnail() never enlarges
+                resized = self.placeholder_img.resize((new_w, new_h), Image.Resampling.BILINEAR)
+            photo = self._placeholder_cache[(new_w, new_h)] = ImageTk.PhotoImage(resized)
+        self.placeholder_photo = photo  # keep reference
         self.placeholder_label.config(image=self.placeholder_photo)
 
     def print_that_shit(self) -> None:
-        print("=" * 20)
-        for i in range(self.playlist.count()):
-            fp = self.playlist.item_at_index(i).get_mrl()
-            fp_readable = unquote(urlparse(fp).path)
-            print(i, fp_readable)
-        self.playlist_frame.refresh_playlist()
+        if self._vlc_ready and logging.getLogger().isEnabledFor(logging.DEBUG):
+            lines = (f"{i} {unquote(urlparse(self.playlist.item_at_index(i).get_mrl()).path)}" for i in range(self.playlist.count()))
+            logging.debug("Playlist:\n%s", "\n".join(lines))
 
     def _embed_vlc(self) -> None:
         handle = self.video_frame.winfo_id()
@@ -383,6 +539,8 @@ class VideoPlayer(cf.SubWindow):
 
     # Control methods
     def toggle_play(self) -> None:
+        if not self._vlc_ready:
+            return
         if self.media_list_player.is_playing():
             self.media_list_player.pause()
         else:
@@ -396,22 +554,30 @@ class VideoPlayer(cf.SubWindow):
         self.root.after(0, lambda: self.playpause_btn.config(text="⏵"))
 
     def stop(self) -> None:
+        if not self._vlc_ready:
+            return
         self.media_list_player.stop()
         self.set_placeholder_into_video_frame()
         self.print_that_shit()
 
     def next(self) -> None:
+        if not self._vlc_ready:
+            return
         self.media_list_player.next()
         self.print_that_shit()
         self.download_btn.configure(style="Media.TButton")
 
     def previous(self) -> None:
+        if not self._vlc_ready:
+            return
         self.media_list_player.previous()
         self.print_that_shit()
         self.download_btn.configure(style="Media.TButton")
 
     def send_to_downloader(self) -> None:
-        current_index = get_current_vlc_list_index(media_list_player=self.media_list_player, playlist=self.playlist)
+        if not self._vlc_ready:
+            return
+        current_index = get_current_vlc_list_index(self.media_list_player, self.playlist, self._mrl_to_index)
         if current_index is None:
             messagebox.showerror(
                 "Error - Current playlist index could not be determined",
@@ -420,14 +586,8 @@ class VideoPlayer(cf.SubWindow):
         media = self.playlist.item_at_index(current_index)
         url = str(media.get_meta(vlc.Meta.Description))
         if url.startswith("streamed:"):
-            match "JDownloader2":
-                case "JDownloader2":
-                    result = self._download_jdownloader2(url)
-
-            if result is True:
-                self.download_btn.configure(style="Success.Media.TButton")
-            else:
-                self.download_btn.configure(style="Failure.Media.TButton")
+            self.download_btn.configure(style="Working.Media.TButton")
+            threading.Thread(target=self._download, args=(url,), daemon=True).start()
         else:
             messagebox.showerror(
                 "Error - Could not download file",
@@ -436,23 +596,45 @@ class VideoPlayer(cf.SubWindow):
                 "If you believe that this is a mistake, please open an issue on GitHub.",
             )
 
-    def _download_jdownloader2(self, url: str) -> bool:
+    def _download(self, url: str) -> None:
+        """Runs in a worker thread, so the UI stays responsive while the downloader is contacted."""
+        error_msg: str | None = "Unexpected error, see the log for details."
+        try:
+            match "JDownloader2":
+                case "JDownloader2":
+                    error_msg = self._download_jdownloader2(url)
+        except Exception:  # pylint:disable=broad-exception-caught  # the button must never stay in its working state
+            logging.exception("Unexpected error while downloading %s.", url)
+        finally:
+            self.window.after(0, self._finish_download, error_msg)
+
+    def _finish_download(self, error_msg: str | None) -> None:
+        if error_msg is None:
+            self.download_btn.configure(style="Success.Media.TButton")
+        else:
+            self.download_btn.configure(style="Failure.Media.TButton")
+            messagebox.showerror("Error - Download via JDownloader2 unsuccessful", message=error_msg)
+
+    def _download_jdownloader2(self, url: str) -> str | None:
+        """Returns None on success, otherwise the error message."""
         logging.info("Downloading %s via JDownloader2...", url)
-        jdurl = f"http://127.0.0.1:9666/flash/add?urls={url}&source=ghostsub_videoplayer"
+        jdurl = "http://127.0.0.1:9666/flash/add"
         try:
-            res = requests.post(jdurl, timeout=10)
+            res = _HTTP.post(jdurl, params={"urls": url, "source": "ghostsub_videoplayer"}, timeout=10)
             if res.status_code == 200:
                 logging.info("Downloading %s via JDownloader2... SUCCESS!", url)
-                return True
+                return None
             error_msg = f"Downloading {url} via JDownloader2... Unsuccessful! Status code: {res.status_code} . Text: {res.text}."
             logging.error(error_msg)
-            messagebox.showerror("Error - Download via JDownloader2 unsuccessful", message=error_msg)
-            return False
+            return error_msg
         except requests.exceptions.Timeout:
             error_msg = f"Downloading {url} via JDownloader2... Unsuccessful! Timeout"
             logging.error(error_msg)
-            messagebox.showerror("Error - Download via JDownloader2 unsuccessful", message=error_msg)
-            return False
+            return error_msg
+        except requests.exceptions.RequestException as error:  # most commonly a ConnectionError: JDownloader2 isn't running
+            error_msg = f"Downloading {url} via JDownloader2... Unsuccessful! {error}"
+            logging.error(error_msg)
+            return error_msg
 
     def add_file(self) -> None:
         filepath = filedialog.askopenfilename(
@@ -464,14 +646,26 @@ class VideoPlayer(cf.SubWindow):
             ],
         )
         if filepath:
+            self._ensure_vlc()
             playlist_was_empty = self.playlist.count() == 0
-            media = vlc.Media(self._instance, filepath)
+            media = self._instance.media_new(filepath)
             media.set_meta(vlc.Meta.Description, "")
-            self.playlist.add_media(media)
+            self._add_media(media)
+            # read title/artist tags in the background now instead of only once the file is played;
+            # the MediaParsedChanged listener from _add_media refreshes the row when done
+            media.parse_with_options(vlc.MediaParseFlag.local, 3000)
             if playlist_was_empty:
                 self.toggle_play()
             self.print_that_shit()
 
+    def _add_media(self, media: vlc.Media) -> None:
+        self._mrl_to_index.setdefault(media.get_mrl(), self.playlist.count())
+        # local files only get their title once VLC has parsed them
+        em = media.event_manager()
+        em.event_attach(vlc.EventType.MediaParsedChanged, lambda _: self.playlist_frame.schedule_refresh())
+        self._media_event_managers.append(em)
+        self.playlist.add_media(media)
+
     def add_any_yt_url(self) -> None:
         """Opens up a dialog box that asks for a youtube link.
         Will attempt to add the video, all video of the youtube playlist, or all channel uploads, depending on URL type.
@@ -483,56 +677,115 @@ class VideoPlayer(cf.SubWindow):
                 inner(obj.get_upload_playlist())
             elif isinstance(obj, youtube.Playlist):
                 self.playlist_frame.more_videos_pending = True
-                em = self.media_list_player.event_manager()
-                for video in obj.yield_elements(part=["snippet"]):
-                    video_id = video["snippet"]["resourceId"]["videoId"]
-                    youtube_url = f"https://youtube.com/watch?v={video_id}"
-
-                    current_index = get_current_vlc_list_index(self.media_list_player, self.playlist)
-                    current_length = self.playlist.count()
-                    while current_index is not None and current_index + playlist_buffer < current_length:
-                        print(time.time(), "waiting for VLC to move to next item...")
-                        wait_for_event_once(em, vlc.EventType.MediaListPlayerNextItemSet)
-
-                        # after VLC advanced, update values and re-check
-                        current_index = get_current_vlc_list_index(self.media_list_player, self.playlist)
-                        current_length = self.playlist.count()
-
-                    self._add_yt_video(youtube_url)
-                self.playlist_frame.more_videos_pending = False
+                self.playlist_frame.schedule_refresh()
+                # extractions overlap in the stream pool, but are added to the playlist in order
+                pending: deque[tuple[str, Future[tuple[str, str, YouTubeMetaData]]]] = deque()
+                batch: list[tuple[str, str, YouTubeMetaData, str]] = []
+
+                def flush() -> None:
+                    if batch:
+                        self.window.after(0, self._add_streams, batch.copy())
+                        batch.clear()
+
+                def collect(url: str, stream: Future[tuple[str, str, YouTubeMetaData]]) -> None:
+                    try:
+                        batch.append((*stream.result(), url))
+                    except STREAM_ERRORS:  # private, removed or region-locked videos are skipped, not the rest of the playlist
+                        logging.exception("Could not extract the stream of %s, skipping it.", url)
+                        return
+                    # an empty playlist should start playing right away instead of waiting for a full batch
+                    if len(batch) >= ADD_BATCH_SIZE or self.playlist.count() == 0:
+                        flush()
+
+                try:
+                    for video in obj.yield_elements(part=["snippet"]):
+                        video_id = video["snippet"]["resourceId"]["videoId"]
+                        youtube_url = f"https://youtube.com/watch?v={video_id}"
+
+                        while True:
+                            # cleared before checking, so an advance in between still wakes the wait below
+                            self._item_advanced.clear()
+                            current_index = get_current_vlc_list_index(self.media_list_player, self.playlist, self._mrl_to_index)
+                            current_length = self.playlist.count() + len(pending) + len(batch)
+                            if current_index is None or current_index + playlist_buffer >= current_length:
+                                break
+                            flush()
+                            logging.debug("Waiting for VLC to move to the next item...")
+                            self._item_advanced.wait()
+
+                        pending.append((youtube_url, self._stream_pool.submit(get_yt_stream, youtube_url)))
+                        if len(pending) >= STREAM_WORKERS:
+                            collect(*pending.popleft())
+                    while pending:
+                        collect(*pending.popleft())
+                    flush()
+                finally:
+                    self.playlist_frame.more_videos_pending = False
+                    self.playlist_frame.schedule_refresh()
             elif isinstance(obj, youtube.Video):
                 self._add_yt_video(obj.url)
             else:
                 print("why")
             self.print_that_shit()
 
-        yturl = simpledialog.askstring(parent=self.window, title="Enter a YouTube URL:", prompt="URL:")
-        if yturl:
+        def parse(yturl: str) -> None:
+            # parsing a channel handle already needs an API call, so this runs off the Tk thread as well
             try:
                 obj = youtube.Youtube().parse_any_url(yturl)
             except youtube.SkippableError:
-                messagebox.showerror(
-                    "Error - Could not parse URL",
-                    message=f"The url you provided:\n{yturl}\ncould not be parsed.\n\n"
-                    "This could be an issue with this program or with YouTube's API.",
-                )
+                self.window.after(0, self._parse_failed, yturl)
                 return
-            threading.Thread(target=inner, args=(obj,)).start()
+            inner(obj)
+
+        yturl = simpledialog.askstring(parent=self.window, title="Enter a YouTube URL:", prompt="URL:")
+        if yturl:
+            self._ensure_vlc()
+            threading.Thread(target=parse, args=(yturl,), daemon=True).start()
+
+    def _parse_failed(self, yturl: str) -> None:
+        messagebox.showerror(
+            "Error - Could not parse URL",
+            message=f"The url you provided:\n{yturl}\ncould not be parsed.\n\n"
+            "This could be an issue with this program or with YouTube's API.",
+        )
 
     def _add_yt_video(self, url: str) -> None:
         """Inner function that takes a youtube video link and adds it.
+        The extraction runs in the stream pool; the result is added on the Tk thread.
 
         Args:
             url (str): Video URL
         """
-        videourl, audiourl, metadata = get_yt_stream(url)
+
+        def done(stream: Future[tuple[str, str, YouTubeMetaData]]) -> None:
+            try:
+                videourl, audiourl, metadata = stream.result()
+            except STREAM_ERRORS:
+                logging.exception("Could not extract the stream of %s.", url)
+                return
+            self.window.after(0, self._add_streams, [(videourl, audiourl, metadata, url)])
+
+        self._stream_pool.submit(get_yt_stream, url).add_done_callback(done)
+
+    def _add_streams(self, streams: list[tuple[str, str, YouTubeMetaData, str]]) -> None:
+        """Adds extracted YouTube streams to the playlist in one batch.
+
+        Args:
+            streams (list[tuple[str, str, YouTubeMetaData, str]]): (video url, audio url, metadata, YouTube url) per video
+        """
+        self._ensure_vlc()
         playlist_was_empty = self.playlist.count() == 0
-        media = vlc.Media(self._instance, videourl)
-        media.add_option(f":input-slave={audiourl}")
-        media.set_meta(vlc.Meta.Title, metadata["title"])
-        media.set_meta(vlc.Meta.Artist, metadata["uploader"])
-        media.set_meta(vlc.Meta.Description, f"streamed:{url}")
-        self.playlist.add_media(media)
+        medias = []
+        for videourl, audiourl, metadata, url in streams:
+            media = self._instance.media_new(videourl)
+            media.add_option(f":input-slave={audiourl}")
+            media.set_meta(vlc.Meta.Title, metadata["title"])
+            media.set_meta(vlc.Meta.Artist, metadata["uploader"])
+            media.set_meta(vlc.Meta.Description, f"streamed:{url}")
+            medias.append(media)
+        # no explicit playlist.lock(): VLC holds it while firing events whose callbacks wait for this (Tk) thread
+        for media in medias:
+            self._add_media(media)
         if playlist_was_empty:
             self.toggle_play()
 
@@ -547,5 +800,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    load_dotenv()
     print(os.getenv("THEME"))
     main()
@@ -4,10 +4,12 @@ import json
 import logging
 import os
 import re
-from collections.abc import Generator
+import threading
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 from typing import Any, Literal
 
-from dotenv import load_dotenv
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -36,6 +38,52 @@ class QuotaError(UnskippableError):
     pass
 
 
+# (class name, id) of everything that verify() has confirmed to exist in this session
+_verified: set[tuple[str, str]] = set()
+# channel handle -> channel ID, resolved at most once per session
+_handle_ids: dict[str, str] = {}
+
+
+def cache_verified(verify: Callable[[Any], bool]) -> Callable[[Any], bool]:
+    """Only positive results are cached, so an ID that failed can be fixed and retried."""
+
+    @wraps(verify)
+    def wrapper(self: Any) -> bool:
+        key = (type(self).__name__, self.id)
+        if key in _verified:
+            return True
+        result = verify(self)
+        if result:
+            _verified.add(key)
+        return result
+
+    return wrapper
+
+
+# error messages of the API that wrap_execute turns into this module's exceptions
+_QUOTA_EXCEEDED_MSG = """The request cannot be completed because you have exceeded your <a href="/youtube/v3/getting-started#quota">quota</a>."""
+_PLAYLIST_NOT_FOUND_MSG = "The playlist identified with the request's <code>playlistId</code> parameter cannot be found."
+
+
+def _map_http_error(e: HttpError) -> Exception:
+    """Returns the exception of this module that stands for the API error e. Also used for errors handed to batch callbacks."""
+    status = e.resp.status
+    reason = e.error_details[0] if hasattr(e, "error_details") else str(e)
+    logging.error("[YouTube API Error] Status %s: %s", status, reason)
+    reason_str = str(reason)
+    if status == 403 and _QUOTA_EXCEEDED_MSG in reason_str:
+        logging.error("Quota issue.")
+        return QuotaError()
+    if status == 404 and _PLAYLIST_NOT_FOUND_MSG in reason_str:
+        logging.warning("Resource not found.")
+        return ResourceNotFoundError()
+    elif status == 400 and "Invalid Value" in reason_str:
+        logging.warning("Invalid Value.")
+        return ResourceNotFoundError()
+    else:
+        return UnskippableError("Uncaught exception :(")
+
+
 def wrap_execute(request: Any) -> Any:
     original_execute = request.execute
 
@@ -43,24 +91,7 @@ def wrap_execute(request: Any) -> Any:
         try:
             return original_execute(*args, **kwargs)
         except HttpError as e:
-            status = e.resp.status
-            reason = e.error_details[0] if hasattr(e, "error_details") else str(e)
-            logging.error("[YouTube API Error] Status %s: %s", status, reason)
-            if (
-                status == 403
-                and """The request cannot be completed because you have exceeded your <a href="/youtube/v3/getting-started#quota">quota</a>."""
-                in str(reason)
-            ):
-                logging.error("Quota issue.")
-                raise QuotaError from e
-            if status == 404 and "The playlist identified with the request's <code>playlistId</code> parameter cannot be found." in str(reason):
-                logging.warning("Resource not found.")
-                raise ResourceNotFoundError from e
-            elif status == 400 and "Invalid Value" in str(reason):
-                logging.warning("Invalid Value.")
-                raise ResourceNotFoundError from e
-            else:
-                raise UnskippableError("Uncaught exception :(") from e
+            raise _map_http_error(e) from e
 
     request.execute = wrapped_execute
     return request
@@ -70,16 +101,23 @@ class ServiceWrapper:
     def __init__(self, service: Any) -> None:
         self._service = service
 
+    def new_batch_http_request(self, *args: Any, **kwargs: Any) -> Any:
+        """Batches aren't API resources, so they are returned unwrapped. Wrap execute() with wrap_execute where needed."""
+        return self._service.new_batch_http_request(*args, **kwargs)
+
     def __getattr__(self, name: str) -> Any:
         attr = getattr(self._service, name)
+        result = attr
         if callable(attr):
 
             def method_wrapper(*args: Any, **kwargs: Any) -> Any:
                 sub_resource = attr(*args, **kwargs)
                 return _wrap_request_methods(sub_resource)
 
-            return method_wrapper
-        return attr
+            result = method_wrapper
+        # cached on the instance, so later lookups of the same name no longer go through __getattr__
+        setattr(self, name, result)
+        return result
 
 
 class RequestWrapper:
@@ -106,17 +144,31 @@ def build_with_wrapped_execute(*args: Any, **kwargs: Any) -> ServiceWrapper:
     return ServiceWrapper(build(*args, **kwargs))
 
 
+_creds: Credentials | None = None
+_creds_lock = threading.Lock()
+_thread_clients = threading.local()
+
+
 class Youtube:
-    VIDEO_PATTERN = r"(?:https?://(?:www\.)?(?:(?:youtube\.com/(?:watch\?v=|shorts/)|youtu.be/)))?([\w\-]{11})"
-    PLAYLIST_PATTERN = r"https?://(?:www\.)?youtube\.com/playlist\?list=([\w\-]+)"
-    CHANNEL_ID_PATTERN = r"https?://(?:www\.)?youtube\.com/channel/(UC[\w\-]{22})$"
-    CHANNEL_HANDLE_PATTERN = r"https?://(?:www\.)?youtube\.com/(@[\w\-]+)$"
+    VIDEO_PATTERN = re.compile(r"(?:https?://(?:www\.)?(?:(?:youtube\.com/(?:watch\?v=|shorts/)|youtu.be/)))?([\w\-]{11})")
+    PLAYLIST_PATTERN = re.compile(r"https?://(?:www\.)?youtube\.com/playlist\?list=([\w\-]+)")
+    CHANNEL_ID_PATTERN = re.compile(r"https?://(?:www\.)?youtube\.com/channel/(UC[\w\-]{22})$")
+    CHANNEL_HANDLE_PATTERN = re.compile(r"https?://(?:www\.)?youtube\.com/(@[\w\-]+)$")
 
     def __init__(self) -> None:
-        load_dotenv()
+        global _creds  # pylint:disable=global-statement
         self.scope = ["https://www.googleapis.com/auth/youtube.force-ssl"]
-        self.creds = self._authorize(self.scope)
-        self.build = build_with_wrapped_execute("youtube", "v3", credentials=self.creds)
+        # Credentials are shared by the whole process, the API client only per thread because httplib2 isn't thread-safe.
+        # Expired credentials are refreshed by the client itself before the next request.
+        with _creds_lock:
+            if _creds is None:
+                _creds = self._authorize(self.scope)
+            self.creds = _creds
+        service: ServiceWrapper | None = getattr(_thread_clients, "service", None)
+        if service is None:
+            service = build_with_wrapped_execute("youtube", "v3", credentials=self.creds)
+            _thread_clients.service = service
+        self.build = service
 
     def _authorize(self, scopes: list[str]) -> Credentials:
         def get_new_creds() -> Credentials:
@@ -155,18 +207,18 @@ class Youtube:
         return creds
 
     def parse_any_url(self, url: str) -> Video | Playlist | Channel:
-        matched = re.match(self.VIDEO_PATTERN, url)
+        matched = self.VIDEO_PATTERN.match(url)
         if matched:
             return Video(matched.group(1))
 
-        matched = re.match(self.PLAYLIST_PATTERN, url)
+        matched = self.PLAYLIST_PATTERN.match(url)
         if matched:
             return Playlist(matched.group(1))
 
-        matched = re.match(self.CHANNEL_HANDLE_PATTERN, url)
+        matched = self.CHANNEL_HANDLE_PATTERN.match(url)
         if matched:
             return Channel(matched.group(1))
-        matched = re.match(self.CHANNEL_ID_PATTERN, url)
+        matched = self.CHANNEL_ID_PATTERN.match(url)
         if matched:
             return Channel(matched.group(1))
 
@@ -180,12 +232,17 @@ class Video(Youtube):
         self.url = f"https://www.youtube.com/watch?v={self.id}"
 
     def _get_id(self, string: str) -> str:
-        matched = re.match(self.VIDEO_PATTERN, string)
+        matched = self.VIDEO_PATTERN.match(string)
         if matched:
             return matched.group(1)
 
         return string
 
+    @classmethod
+    def has_valid_format(cls, string: str) -> bool:
+        """Offline check whether the string can be a video ID or URL at all, before spending API calls on it."""
+        return cls.VIDEO_PATTERN.match(string) is not None
+
     def get_data(
         self,
         part: list[
@@ -211,12 +268,13 @@ class Video(Youtube):
         # doc: https://developers.google.com/youtube/v3/docs/videos/list
         request = self.build.videos().list(part=",".join(part), fields=fields, id=self.id, maxResults=1)  # pylint:disable=no-member
         response = request.execute()
-        data: dict = response["items"][0]
+        data: dict = (response.get("items") or [])[0]  # a masked response without matches can omit "items" entirely
         return data
 
+    @cache_verified
     def verify(self) -> bool:
         try:
-            result = self.get_data(["id"])
+            result = self.get_data(["id"], fields="items/id")
             assert result
             return "id" in result and result["id"] == self.id
         except IndexError:
@@ -224,35 +282,54 @@ class Video(Youtube):
 
 
 class Playlist(Youtube):
+    ID_PATTERN = re.compile(r"[\w\-]+")
+
     def __init__(self, playlist_id: str) -> None:
         super().__init__()
         self.id = self._get_id(playlist_id)
+        # video ID -> playlist item IDs in playlist order, built by the first get_video_playlist_id call and kept up to date by
+        # add_video/remove_video/remove_videos, so a run of removals doesn't page through the playlist again
+        self._video_playlist_ids: dict[str, list[str]] | None = None
 
     def _get_id(self, string: str) -> str:
-        matched = re.match(self.PLAYLIST_PATTERN, string)
+        matched = self.PLAYLIST_PATTERN.match(string)
         if matched:
             return matched.group(1)
 
         return string
 
+    @classmethod
+    def has_valid_format(cls, string: str) -> bool:
+        """Offline check whether the string can be a playlist ID or URL at all, before spending API calls on it."""
+        return cls.PLAYLIST_PATTERN.match(string) is not None or cls.ID_PATTERN.fullmatch(string) is not None
+
     def yield_elements(
         self,
         part: list[Literal["contentDetails", "snippet", "id", "status"]],
         fields: str | None = None,
+        page_size: int = 50,
+        limit: int | None = None,
     ) -> Generator[dict]:
+        """Yields the playlist items page by page. With limit, no more than limit items are requested from the API."""
         # docs: https://developers.google.com/youtube/v3/docs/playlistItems/list
         next_page_token = None
-        while True:
+        remaining = limit
+        while remaining is None or remaining > 0:
             request = self.build.playlistItems().list(  # pylint:disable=no-member
                 part=",".join(part),
                 fields=fields,
                 playlistId=self.id,
-                maxResults=50,
+                maxResults=page_size if remaining is None else min(page_size, remaining),
                 pageToken=next_page_token,
             )
             response = request.execute()
-            logging.info(json.dumps(response, indent=4))
-            yield from response["items"]
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("Playlist %s page: %s", self.id, json.dumps(response))
+            items = response["items"]
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            yield from items
 
             next_page_token = response.get("nextPageToken")
             if not next_page_token:
@@ -271,8 +348,10 @@ class Playlist(Youtube):
                 },
             )
             response = request.execute()
-            logging.info(json.dumps(response, indent=4))
-            logging.info(response)
+            if self._video_playlist_ids is not None and "id" in response:
+                self._video_playlist_ids.setdefault(video_id, []).append(str(response["id"]))  # inserts go to the end of the playlist
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("Added video %s to playlist %s: %s", video_id, self.id, json.dumps(response))
             return "id" in response
         except HttpError as error:
             logging.error(
@@ -294,11 +373,26 @@ class Playlist(Youtube):
             raise error
 
     def get_video_playlist_id(self, video_id: str) -> str | Literal[False]:
-        for video_element in self.yield_elements(["id", "snippet"]):
-            logging.info(json.dumps(video_element, indent=4))
-            if video_element["snippet"]["resourceId"]["videoId"] == video_id:
-                return str(video_element["id"])
-        return False
+        if self._video_playlist_ids is None:
+            video_playlist_ids: dict[str, list[str]] = {}
+            for video_element in self.yield_elements(["id", "snippet"], fields="items(id,snippet/resourceId/videoId),nextPageToken"):
+                video_playlist_ids.setdefault(video_element["snippet"]["resourceId"]["videoId"], []).append(str(video_element["id"]))
+            self._video_playlist_ids = video_playlist_ids
+        item_ids = self._video_playlist_ids.get(video_id)
+        return item_ids[0] if item_ids else False  # first occurrence wins, like the linear search this replaced
+
+    def _forget_playlist_item(self, video_playlist_id: str, video_id: str | None = None) -> None:
+        """Drops a removed playlist item from the lookup map, if it has been built. Without video_id, the map is searched for it."""
+        if self._video_playlist_ids is None:
+            return
+        candidates = [video_id] if video_id is not None else list(self._video_playlist_ids)
+        for candidate in candidates:
+            item_ids = self._video_playlist_ids.get(candidate)
+            if item_ids and video_playlist_id in item_ids:
+                item_ids.remove(video_playlist_id)
+                if not item_ids:
+                    del self._video_playlist_ids[candidate]
+                return
 
     def remove_video(self, video_id: str | None = None, video_playlist_id: str | None = None) -> bool:
 
@@ -312,6 +406,7 @@ class Playlist(Youtube):
 
             del_request = self.build.playlistItems().delete(id=video_playlist_id)  # pylint:disable=no-member
             del_request.execute()
+            self._forget_playlist_item(video_playlist_id, video_id)
             return True
         except AssertionError:
             logging.warning(
@@ -328,10 +423,48 @@ class Playlist(Youtube):
             )
         return False
 
+    def remove_videos(self, video_playlist_ids: list[str], batch_size: int = 50) -> bool:
+        """Removes several playlist entries, sending up to batch_size deletes in one batched HTTP request.
+        Stops after the first batch with a failure, so a broken run doesn't keep spending quota.
+        Raises QuotaError after that batch if any of its deletes ran out of quota, like a single wrapped request would."""
+        failed: list[str] = []
+        quota_errors: list[tuple[QuotaError, HttpError]] = []
+
+        def on_delete(video_playlist_id: str, _response: Any, exception: HttpError | None) -> None:
+            if exception is not None:
+                # the batch hands over the raw HttpError, so it gets the same mapping as every wrapped request
+                error = _map_http_error(exception)
+                if isinstance(error, QuotaError):
+                    quota_errors.append((error, exception))
+                logging.error(
+                    "An error occurred while removing video %s from playlist %s: %s",
+                    video_playlist_id,
+                    self.id,
+                    exception,
+                )
+                failed.append(video_playlist_id)
+
+        for start in range(0, len(video_playlist_ids), batch_size):
+            batch = self.build.new_batch_http_request(callback=on_delete)
+            for video_playlist_id in video_playlist_ids[start : start + batch_size]:
+                batch.add(self.build.playlistItems().delete(id=video_playlist_id), request_id=video_playlist_id)  # pylint:disable=no-member
+            wrap_execute(batch).execute()
+            for video_playlist_id in video_playlist_ids[start : start + batch_size]:
+                if video_playlist_id not in failed:
+                    self._forget_playlist_item(video_playlist_id)
+            if quota_errors:
+                error, cause = quota_errors[0]
+                raise error from cause
+            if failed:
+                return False
+        return True
+
+    @cache_verified
     def verify(self) -> bool:
         try:
             request = self.build.playlistItems().list(  # pylint:disable=no-member
                 part="id",
+                fields="items/id",
                 playlistId=self.id,
                 maxResults=1,
             )
@@ -342,17 +475,19 @@ class Playlist(Youtube):
 
 
 class Channel(Youtube):
+    ID_PATTERN = re.compile(r"UC[\w\-]{22}|@[\w\-.]+")
+
     def __init__(self, channel_id: str) -> None:
         super().__init__()
         self.id = self._get_id(channel_id)
         self.playlist_upload_id: str | None = None
 
     def _get_id(self, string: str) -> str:
-        matched = re.match(self.CHANNEL_ID_PATTERN, string)
+        matched = self.CHANNEL_ID_PATTERN.match(string)
         if matched:
             return matched.group(1)
 
-        matched = re.match(self.CHANNEL_HANDLE_PATTERN, string)
+        matched = self.CHANNEL_HANDLE_PATTERN.match(string)
         if matched:
             return self._convert_handle_to_id(matched.group(1))
 
@@ -361,14 +496,28 @@ class Channel(Youtube):
 
         return string
 
+    @classmethod
+    def has_valid_format(cls, string: str) -> bool:
+        """Offline check whether the string can be a channel ID, handle or URL at all, before spending API calls on it."""
+        return (
+            cls.CHANNEL_ID_PATTERN.match(string) is not None
+            or cls.CHANNEL_HANDLE_PATTERN.match(string) is not None
+            or cls.ID_PATTERN.fullmatch(string) is not None
+        )
+
     def _convert_handle_to_id(self, handle: str) -> str:
+        if handle in _handle_ids:
+            return _handle_ids[handle]
         request = self.build.channels().list(  # pylint:disable=no-member
             part="id",
+            fields="items/id",
             forHandle=handle,
         )
         response = request.execute()
-        if response and "items" in response and "id" in response["items"][0]:
-            return str(response["items"][0]["id"])
+        items = (response or {}).get("items") or []
+        if items and "id" in items[0]:
+            channel_id = _handle_ids[handle] = str(items[0]["id"])
+            return channel_id
         raise UnskippableError(f"Some unknown BS happened while turning a Channel handle into a Channel ID. Response: {response}")
 
     def get_data(
@@ -395,7 +544,8 @@ class Channel(Youtube):
             id=self.id,
         )
         response: dict = request.execute()
-        logging.info(json.dumps(response, indent=4))
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("Channel %s data: %s", self.id, json.dumps(response))
         return response
 
     def get_upload_playlist(
@@ -425,18 +575,15 @@ class Channel(Youtube):
     def get_profile_image(self, specific_size: int | bool = False) -> str:
         thumbnails: dict = self.get_data(part=["snippet"], fields="items/snippet/thumbnails")["items"][0]["snippet"]["thumbnails"]
 
-        max_height = -1
-        max_url = ""
-        for thumbnail in thumbnails.values():
-            if specific_size and max_height >= specific_size:
-                return max_url
-            if thumbnail["height"] > max_height:
-                max_url = thumbnail["url"]
-                max_height = thumbnail["height"]
-
+        ordered = sorted(thumbnails.values(), key=lambda thumbnail: thumbnail["height"])
+        largest = ordered[-1]
         if specific_size:
-            return max_url.replace(f"s{max_height}", f"s{specific_size}")
-        return max_url
+            # smallest thumbnail that is big enough, otherwise ask for the largest one in the wanted size
+            for thumbnail in ordered:
+                if thumbnail["height"] >= specific_size:
+                    return str(thumbnail["url"])
+            return str(largest["url"]).replace(f"s{largest['height']}", f"s{specific_size}")
+        return str(largest["url"])
 
     def list_uploads(
         self,
@@ -451,20 +598,18 @@ class Channel(Youtube):
             livestreams_only=livestreams_only,
             shorts_only=shorts_only,
         )
-        for i, video_element in enumerate(
-            p.yield_elements(
-                part=["snippet"],
-                fields="items/snippet/resourceId/videoId,prevPageToken,nextPageToken",
-            )
-        ):
-            if size and i + 1 >= size:  # i+1 so that size is the amount of IDs yielded
-                break
-            video_id = video_element["snippet"]["resourceId"]["videoId"]
-            yield video_id
+        elements = p.yield_elements(
+            part=["snippet"],
+            fields="items/snippet/resourceId/videoId,nextPageToken",
+            limit=size or None,  # size is the amount of IDs yielded
+        )
+        for video_element in elements:
+            yield video_element["snippet"]["resourceId"]["videoId"]
 
+    @cache_verified
     def verify(self) -> bool:
-        result = self.get_data(["id"])
-        return "items" in result and "id" in result["items"][0] and result["items"][0]["id"] == self.id
+        items = self.get_data(["id"], fields="items/id").get("items") or []  # a masked response without matches can omit "items"
+        return bool(items) and items[0].get("id") == self.id
 
 
 def add_video_to_playlist(
@@ -494,13 +639,23 @@ def add_playlist_to_playlist(
         assert target_playlist_id
         target_playlist = Playlist(target_playlist_id)
 
+    src_id = src_playlist.id
     success = True
-    for video_element in src_playlist.yield_elements(
-        part=["snippet"],
-        fields="items/snippet/resourceId/videoId,prevPageToken,nextPageToken",
-    ):
-        video_id = video_element["snippet"]["resourceId"]["videoId"]
-        success = bool(success * target_playlist.add_video(video_id))
+    # The source is read one element ahead in a worker thread with its own API client, so page requests overlap with the inserts.
+    # The inserts themselves stay sequential, parallel ones would scramble the order of the target playlist.
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        elements = prefetcher.submit(
+            lambda: Playlist(src_id).yield_elements(
+                part=["snippet"],
+                fields="items/snippet/resourceId/videoId,prevPageToken,nextPageToken",
+            )
+        ).result()
+        upcoming = prefetcher.submit(next, elements, None)
+        while (video_element := upcoming.result()) is not None:
+            upcoming = prefetcher.submit(next, elements, None)
+            video_id = video_element["snippet"]["resourceId"]["videoId"]
+            if not target_playlist.add_video(video_id):
+                success = False  # keep going, the remaining videos should still be added
     return success
 
 